@@ -1,10 +1,18 @@
 # ----- CONFIGURAÇÕES ----
 
 import streamlit as st
-import plotly.express as px
-import pandas as pd
 import numpy as np
-import duckdb
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from dashboard.charts import plot_bar, plot_hist, plot_scatter
+from dashboard.cube import SKETCH_ALPHA, PriceCube
+from dashboard.data import data_version, load_processed
+from dashboard.filters import FilterIndex
+from dashboard.queries import QueryEngine
+from dashboard.report import load_report
 
 st.set_page_config(
     page_title="Mercado Imobiliário Fortaleza/CE",
@@ -16,108 +24,47 @@ st.title("🏡 Análise do Mercado Imobiliário de Fortaleza/CE")
 st.markdown("**Dados Extraídos de Imobiliária Lopes e Chaves na Mão**")
 
 # ----- FUNÇÕES -----
-@st.cache_data
-def load_data():
+# Recursos por versão dos dados: com max_entries=1 só a versão atual fica em cache,
+# e os da versão anterior (conexão DuckDB, bitmaps, figuras) são liberados quando
+# as sessões que ainda os usam terminam
+@st.cache_resource(max_entries=1)
+def load_index(version:int):
     """
-    Carrega os dados em um pd.DataFrame
+    Dados, índice dos filtros (dashboard.filters) e cubo dos KPIs (dashboard.cube),
+    montados uma vez por versão dos dados e compartilhados entre as sessões: o
+    DataFrame não deve ser alterado
     """
-    df = pd.read_csv("data/processed/clean_data.csv")
-    return df
+    df = load_processed()
+    indice = FilterIndex(df)
+    return df, indice, PriceCube(df, indice)
 
-def plot_hist(data:pd.DataFrame, x:str, color:str, title:str, xlabel:str, ylabel:str):
+@st.cache_resource(max_entries=1)
+def load_queries(version:int):
     """
-    Cria um histograma utilizando Plotly Express
+    Conexão DuckDB com os dados carregados como tabela imoveis e cache LRU dos
+    resultados (dashboard.queries), uma por processo e versão dos dados
     """
-    fig = px.histogram(
-        data,
-        x = x,
-        color = color,
-        histnorm='percent',
-        barmode = 'overlay',
-        nbins=40,
-        title = title,
-        labels = {x: xlabel.capitalize(), 'count': ylabel, color: color.capitalize()},
-        color_discrete_sequence=['#3d405b', '#00c6c2', '#168582', '#324b4a']
-    )
-
-    fig.update_layout(
-        plot_bgcolor = 'rgba(0, 0, 0, 0)',
-        xaxis_title = xlabel,
-        yaxis_title = ylabel,
-        bargap = 0.1
-    )
+    df, _, _ = load_index(version)
+    return QueryEngine(df, version)
 
-    return fig
-
-def plot_scatter(data:pd.DataFrame, title:str, x:str, y:str, xlabel:str, ylabel:str):
+@st.cache_resource(max_entries=1)
+def load_figures(version:int):
     """
-    Cria um scatter plot utilizando Plotly Express
+    Figuras da aba de relatório (dashboard.report), lidas de
+    data/state/report/report.json ou montadas uma vez por versão dos dados
     """
-    fig = px.scatter(
-        data,
-        x=x,
-        y=y,
-        title=title,
-        labels={x: xlabel, y: ylabel},
-        trendline='ols',
-        trendline_color_override='#9c5a5d',
-        color_discrete_sequence=['#00c6c2', '#168582', '#324b4a'],
-        opacity=0.30
-
-    )
-    pass
-
-    fig.update_layout(
-        plot_bgcolor = 'rgba(0, 0, 0, 0)',
-    )
-
-    return fig
-
-def plot_bar(data:pd.DataFrame, title:str, x:str, y:str, xlabel:str, ylabel:str):
-    """
-    Cria um gráfico de barras utilizando Plotly Express
-    """
-    fig = px.histogram(
-        data,
-        x=x,
-        y=y,
-        title=title,
-        color_discrete_sequence=['#3d405b', '#00c6c2', '#168582', '#324b4a']
-    )
-
-    fig.update_layout(
-        plot_bgcolor = 'rgba(0, 0, 0, 0)',
-        xaxis_title=xlabel,
-        yaxis_title=ylabel
-    )
+    df, _, _ = load_index(version)
+    return load_report(version, df, load_queries(version))
 
-    return fig
-
-def plot_bars(data:pd.DataFrame, title:str, x:str, xlabel:str, ylabel:str):
-    """
-    Cria um gráfico de barras utilizando Plotly Express
-    """
-    fig = px.histogram(
-        data,
-        x=x,
-        histnorm='percent',
-        title=title,
-        color_discrete_sequence=['#3d405b', '#00c6c2', '#168582', '#324b4a']
-    )
-
-    fig.update_layout(
-        plot_bgcolor = 'rgba(0, 0, 0, 0)',
-        xaxis_title=xlabel,
-        yaxis_title=ylabel,
-        bargap=0.1
-    )
-    pass
-
-    return fig
+# Colunas da tabela de anúncios que podem ser usadas na ordenação
+ORDENACAO = {'preco': 'Preço', 'area': 'Área', 'condo': 'Condomínio'}
 
 # ----- CARREGAMENTO DOS DADOS -----
 
-df = load_data()
+versao = data_version()
+df, indice, cubo = load_index(versao)
+consultas = load_queries(versao)
+figuras = load_figures(versao)
 
 # ----- TABS ------
 
@@ -128,37 +75,34 @@ with st.sidebar:
     st.header("Filtros")
 
     # Filtro por Tipo de Imóvel
-    tipos_unicos = df['tipo'].unique()
-    tipo_selecionado = st.selectbox("Tipo de Imóvel", ['Todos'] + list(tipos_unicos))
+    tipo_selecionado = st.selectbox("Tipo de Imóvel", ['Todos'] + indice.values('tipo'))
 
     # Filtro por Bairro (Localização)
-    bairros_unicos = df['localizacao'].unique()
-    bairros_selecionados = st.multiselect("Bairro", bairros_unicos)
+    bairros_selecionados = st.multiselect("Bairro", indice.values('localizacao'))
 
-    # Filtro por SER (se presente nos seus dados)
-    if 'ser' in df.columns:
-        sers_unicos = df['ser'].unique()
-        ser_selecionado = st.selectbox("Secretaria Regional Executiva", ['Todos'] + list(sers_unicos))
+    # Filtro por SER
+    ser_selecionado = st.selectbox("Secretaria Regional Executiva", ['Todos'] + indice.values('ser'))
 
     # Filtro por Faixa de Preço
-    preco_min, preco_max = int(df['preco'].min()), int(df['preco'].max())
+    preco_min, preco_max = (int(valor) for valor in indice.price_range())
     preco_range = st.slider("Faixa de Preço (R$)", preco_min, preco_max, (preco_min, preco_max))
 
 # ----- FILTRAGEM DOS DADOS -----
 
-df_filtrado = df.copy()
-
-if tipo_selecionado != 'Todos':
-    df_filtrado = df_filtrado[df_filtrado['tipo'] == tipo_selecionado]
+filtros = {
+    'tipo': None if tipo_selecionado == 'Todos' else tipo_selecionado,
+    'localizacao': bairros_selecionados,
+    'ser': None if ser_selecionado == 'Todos' else ser_selecionado,
+}
 
-if bairros_selecionados:
-    df_filtrado = df_filtrado[df_filtrado['localizacao'].isin(bairros_selecionados)]
+# KPIs e rankings: soma das células do cubo (e das linhas nas pontas da faixa de preço)
+selecao = cubo.select(filtros, preco_range)
+totais = cubo.totals(selecao)
 
-preco_min_selecionado, preco_max_selecionado = preco_range
-df_filtrado = df_filtrado[(df_filtrado['preco'] >= preco_min_selecionado) & (df_filtrado['preco'] <= preco_max_selecionado)]
-
-if 'ser' in df.columns and ser_selecionado != 'Todos':
-    df_filtrado = df_filtrado[df_filtrado['ser'] == ser_selecionado]
+# Gráficos e tabela com os anúncios: posições das linhas selecionadas; o
+# DataFrame só é copiado uma vez, e só se algum filtro restringir as linhas
+linhas = indice.select(filtros, preco_range)
+df_filtrado = df if len(linhas) == len(df) else df.take(linhas)
 
 
 # ----- DASHBOARD -----
@@ -168,11 +112,12 @@ with tab_dash:
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        st.metric(label="🏡 Total de Imóveis", value=f"{df_filtrado.shape[0]:,.0f}".replace(",", "X").replace(".", ",").replace("X", "."))
+        st.metric(label="🏡 Total de Imóveis", value=f"{totais['qt_imoveis']:,.0f}".replace(",", "X").replace(".", ",").replace("X", "."))
     with col2:
-        st.metric(label="💰 Volume Geral de Vendas", value=f"R$ {(df_filtrado['preco'].sum())/1000000000:,.2f} bi".replace(",", "X").replace(".", ",").replace("X", "."))
+        st.metric(label="💰 Volume Geral de Vendas", value=f"R$ {totais['soma_preco']/1000000000:,.2f} bi".replace(",", "X").replace(".", ",").replace("X", "."))
     with col3:
-        st.metric(label="💸 Preço Mediano", value=f"R$ {df_filtrado['preco'].median():,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+        st.metric(label="💸 Preço Mediano", value=f"R$ {totais['mediana']:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."),
+                  help=f"Estimada pelo sketch de quantis do cubo, com erro de até {SKETCH_ALPHA:.0%} em relação à mediana exata")
 
     # Gráficos
     col1, col2 = st.columns(2)
@@ -190,21 +135,7 @@ with tab_dash:
         )
 
 
-    bairros = duckdb.sql(
-        """
-        SELECT
-            localizacao
-            , ser AS SER
-            , AVG(preco)::DECIMAL(18, 2) AS preco_medio
-            , COUNT(localizacao) AS qt_imoveis
-        FROM df_filtrado
-        GROUP BY localizacao, ser
-        HAVING qt_imoveis > 20
-        ORDER BY  preco_medio DESC
-        LIMIT 10
-        """
-    ).to_df()
-
+    bairros = cubo.ranking(selecao, 'preco').round({'preco_medio': 2})
 
     st.plotly_chart(
         plot_bar(bairros, 'Bairros com Maior Preço Médio de Imóvel', 'localizacao', 'preco_medio', 'Bairro', 'Preço Médio (R$)')
@@ -212,56 +143,32 @@ with tab_dash:
 
     col3, col4 = st.columns(2)
     with col3:
-        bairros_m2 = duckdb.sql(
-            """
-            WITH cte AS (
-                SELECT
-                    localizacao
-                    , preco/area AS preco_m2
-                FROM df_filtrado
-                GROUP BY localizacao, area, preco
-            )
-            SELECT 
-                localizacao
-                , AVG(preco_m2) AS avg_preco_m2
-                , COUNT(localizacao) AS qt_imoveis 
-            FROM cte
-            GROUP BY localizacao
-            HAVING qt_imoveis > 20
-            ORDER BY 2 DESC
-            LIMIT 10
-            """
-        )
-        
+        bairros_m2 = cubo.ranking(selecao, 'preco_m2')
+
         st.plotly_chart(plot_bar(bairros_m2, 'Bairros com Maior Preço de m²', 'localizacao', 'avg_preco_m2', 'Bairro', 'Preço (R$/m²)'))
 
     with col4:
-        bairros_m2_2 = duckdb.sql(
-            """
-            WITH cte AS (
-                SELECT
-                    localizacao
-                    , preco/area AS preco_m2
-                FROM df_filtrado
-                GROUP BY localizacao, area, preco
-            )
-            SELECT 
-                localizacao
-                , AVG(preco_m2) AS avg_preco_m2
-                , COUNT(localizacao) AS qt_imoveis 
-            FROM cte
-            GROUP BY localizacao
-            HAVING qt_imoveis > 20
-            ORDER BY 2 ASC
-            LIMIT 10
-            """
-        )    
+        bairros_m2_2 = cubo.ranking(selecao, 'preco_m2', ascending=True)
 
         st.plotly_chart(plot_bar(bairros_m2_2, 'Bairros com Menor Preço de m²', 'localizacao', 'avg_preco_m2', 'Bairro', 'Preço (R$/m²)'))
 
-    # Dados do dataframe
+    # Dados do dataframe: uma página por vez, ordenada e paginada no DuckDB (dashboard.queries)
     st.markdown("**Dados originais**")
-    st.dataframe(df_filtrado)
+
+    total_linhas = consultas.count(filtros, preco_range)
+    col5, col6, col7, col8 = st.columns(4)
+    with col5:
+        ordem = st.selectbox("Ordenar por", list(ORDENACAO), format_func=ORDENACAO.get)
+    with col6:
+        decrescente = st.toggle("Decrescente", value=True)
+    with col7:
+        por_pagina = st.selectbox("Linhas por página", [25, 50, 100], index=1)
+    with col8:
+        paginas = max(1, -(-total_linhas // por_pagina))
+        pagina = st.number_input("Página", min_value=1, max_value=paginas, value=1, step=1)
+
+    st.dataframe(consultas.page(filtros, preco_range, ordem, decrescente, pagina, por_pagina), hide_index=True)
+    st.caption(f"Página {pagina} de {paginas} ({total_linhas:,} imóveis)".replace(",", "."))
     
     st.markdown("---")
     st.markdown("Desenvolvido por [André Lopes](https://www.linkedin.com/in/andreluizls1/) (Abril 2025)")
@@ -331,19 +238,9 @@ with tab_report:
         """
     )
 
-    df = load_data()
-    df = duckdb.sql(
-    """
-    SELECT
-        *
-        , CASE WHEN quartos >= 5 THEN 5 ELSE quartos END AS quartos_ord
-        , CASE WHEN banheiros >= 5 THEN 5 ELSE banheiros END AS banheiros_ord
-        , CASE WHEN vagas >= 5 THEN 5 ELSE vagas END AS vagas_ord
-    FROM df
-    """).to_df()
-    df = duckdb.sql("SELECT * FROM df WHERE tipo IN ('Apartamento', 'Casa', 'Condomínio')").to_df()
+    # Colunas ordinais e filtro de tipos já aplicados em transform/processed.py
 
-    st.plotly_chart(plot_bars(df, 'Proporção por Tipo de Imóvel', 'tipo', 'Tipo', 'Proporção (%)'), use_container_width=True)
+    st.plotly_chart(figuras['tipos'], use_container_width=True)
 
     st.markdown(
         """
@@ -357,11 +254,7 @@ with tab_report:
         """
     )
 
-    bairros = duckdb.sql("SELECT localizacao, COUNT(localizacao) AS count FROM df GROUP BY localizacao ORDER BY 2 DESC LIMIT 10")
-
-    st.plotly_chart(
-        plot_bar(bairros, 'Distribuição de Imóveis por Bairro', 'localizacao', 'count', 'Bairro', 'Contagem')
-    )
+    st.plotly_chart(figuras['bairros'])
 
     st.markdown(
         """
@@ -369,13 +262,9 @@ with tab_report:
         """
     )
 
-    ser = duckdb.sql("SELECT ser, COUNT(ser) AS count FROM df GROUP BY ser ORDER BY 2 DESC")
-
     col5, col6 = st.columns(2)
     with col5:
-        st.plotly_chart(
-            plot_bar(ser, 'Distribuição de Imóveis por SER', 'ser', 'count', 'Secretaria Regional Executiva Executiva Regional', 'Contagem'), use_container_width=True
-        )
+        st.plotly_chart(figuras['ser'], use_container_width=True)
     with col6:
         img = 'doc/img/JktxiIv.png'
         st.image(img, use_container_width=True)
@@ -388,17 +277,11 @@ with tab_report:
         """
     )
 
-    st.plotly_chart(
-        plot_bars(df, 'Distribuição de Quartos', 'quartos_ord', 'Quartos', 'Proporção (%)'), use_container_width=True
-    )
+    st.plotly_chart(figuras['quartos'], use_container_width=True)
 
-    st.plotly_chart(
-        plot_bars(df, 'Distribuição de Banheiros', 'banheiros_ord', 'Banheiros', 'Proporção (%)'), use_container_width=True
-    )
+    st.plotly_chart(figuras['banheiros'], use_container_width=True)
 
-    st.plotly_chart(
-        plot_bars(df, 'Distribuição de Vagas', 'vagas_ord', 'Vagas', 'Proporção (%)'), use_container_width=True
-    )
+    st.plotly_chart(figuras['vagas'], use_container_width=True)
 
     st.markdown(
         """
@@ -406,9 +289,7 @@ with tab_report:
         """
     )
 
-    st.plotly_chart(
-        plot_bars(df, 'Distribuição por Preço de Oferta', 'preco', 'Preço (R$)', 'Proporção (%)'), use_container_width=True
-    )
+    st.plotly_chart(figuras['preco'], use_container_width=True)
 
     st.text(
         """
@@ -416,17 +297,11 @@ with tab_report:
         """
     )
 
-    st.plotly_chart(
-        plot_bars(df[df['preco']<=5_000_000], 'Distribuição por Preço de Oferta (até R$ 5mi)', 'preco', 'Preço (R$)', 'Proporção (%)'), use_container_width=True
-    )
+    st.plotly_chart(figuras['preco_5mi'], use_container_width=True)
 
     st.text("A oferta se concentra em imóves de até R$ 1mi.")
     st.markdown("#### 3.5. Preço x Tipo")
-    st.plotly_chart(
-        plot_hist(
-            df[df['preco']<=1_000_000], 'preco', 'tipo', 'Distribuição Preço x Tipo', 'Preço (R$)', 'Proporção (%)' 
-        ), use_container_width=True
-    )
+    st.plotly_chart(figuras['preco_tipo'], use_container_width=True)
     st.text(
         """
         Apartamentos são os imóveis mais acessíveis, é possível encontrar eles em toda faixa de preço mas são predominantes em valores menores que R$ 500.000,00. Casas dentro e fora de condomínios também aparecem em praticamente todas as faixar de preço mas aparecem mais a partir dos R$ 300.000,00. 
@@ -434,23 +309,7 @@ with tab_report:
     )
     st.markdown("#### 3.6 Preço Médio por Bairro")
 
-    bairros_2 = duckdb.sql(
-    """
-    SELECT
-        localizacao
-        , AVG(preco)::DECIMAL(18, 2) AS preco_medio
-        , COUNT(localizacao) AS qt_imoveis
-    FROM df
-    GROUP BY localizacao
-    HAVING qt_imoveis > 20
-    ORDER BY 2 DESC
-    LIMIT 10
-    """
-    )
-
-    st.plotly_chart(
-        plot_bar(bairros_2, 'Preço Médio por Bairro (Top 10)', 'localizacao', 'preco_medio', 'Baiirro', 'Preço (R$)'), use_container_width=True
-    )
+    st.plotly_chart(figuras['preco_bairro'], use_container_width=True)
     st.text(
         """
         Os bairros com maior média de preço estão localizados próximos à orla e ao centro da cidade (especialmente nas SER 2 e 7). O Alphaville Fortaleza é localizado dentro do bairro da Sabiaguaba, e próximo também a outra área valoriza que são bairros próximos à cidade de Eusébio (como o Coaçu) que é uma cidade parte da Região Metropilitana de Fortaleza (RMF) que passa por um alto crescimento e expansão de infraestrutura e mercado imobliário.
@@ -458,29 +317,7 @@ with tab_report:
     )
     st.markdown("#### 3.7 Preço Médio por Metro Quadrado") 
 
-    bairros_3 = duckdb.sql(
-    """
-    WITH cte AS (
-        SELECT
-            localizacao
-            , preco/area AS preco_m2
-        FROM df
-        GROUP BY localizacao, area, preco
-    )
-    SELECT 
-        localizacao
-        , AVG(preco_m2) AS avg_preco_m2
-        , COUNT(localizacao) AS qt_imoveis 
-    FROM cte
-    GROUP BY localizacao
-    HAVING qt_imoveis > 20
-    ORDER BY 2 DESC
-    LIMIT 10
-    """
-    )
-    st.plotly_chart(
-        plot_bar(bairros_3, 'Preço Médio m² por Bairro (Top 10)', 'localizacao', 'avg_preco_m2', 'Bairro', 'Preço (R$/m²)')
-    )
+    st.plotly_chart(figuras['preco_m2_bairro'])
     st.text(
         """
         Mucuripe, Meireles e Guararapes se demonstram bairros com alto potencial de investimento por seu alto valor de metro quadrado, mas isso exige altos aportes, assim como o bairro de Lourdes. O Parque Iracema também possui um alto valor no preço do metro quadrado, ele está localizado na SER 6, e é próximo de bairros como Messejana, Cambeba e Cajazeiras que possuem um grande extensão territorial. 
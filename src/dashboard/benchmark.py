@@ -0,0 +1,225 @@
+"""
+Benchmarks do dashboard (src/app.py)
+
+Executar a partir da raiz do repositório:
+    python src/dashboard/benchmark.py filters --scales 1 20 200
+    python src/dashboard/benchmark.py cube --scales 1 20 200
+    python src/dashboard/benchmark.py report
+    python src/dashboard/benchmark.py scatter --scales 1 20 200
+
+filters: latência dos filtros da barra lateral com máscaras do pandas (df.copy()
+e um filtro encadeado por widget, como o app fazia) e com FilterIndex, em cópias
+de data/processed/clean_data.csv repetidas --scales vezes. Para cada escala são
+medidas combinações típicas de filtros; a coluna "índice" é só a seleção das
+posições, "índice + take" inclui montar o DataFrame filtrado.
+
+cube: KPIs (total, volume, mediana) e os três rankings de bairros do dashboard
+calculados com DuckDB sobre as linhas filtradas (como o app fazia) e somando as
+células de PriceCube, nas mesmas escalas e combinações de filtros, com o erro
+relativo da mediana estimada.
+
+report: tempo para obter as figuras da aba de relatório montando-as a partir
+dos dados (como o app fazia a cada execução) e lendo as especificações gravadas
+por dashboard.report, e o tempo de serialização das figuras para o navegador.
+
+scatter: gráfico preço x área com px.scatter(trendline='ols') (como o app fazia)
+e com dashboard.charts.plot_scatter (amostra e densidade), nas mesmas escalas:
+tempo para montar e serializar a figura e tamanho do JSON enviado ao navegador.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+import plotly.express as px
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dashboard.charts import plot_scatter
+from dashboard.cube import PriceCube
+from dashboard.filters import FilterIndex
+from dashboard.queries import QueryEngine
+from dashboard.report import build_figures, read_report, save_report
+from transform.schema import read_csv
+
+ROOT = Path(__file__).resolve().parents[2]
+PROCESSED_CSV = ROOT / "data" / "processed" / "clean_data.csv"
+
+# Combinações de filtros: tipo, bairros, SER e faixa de preço
+SCENARIOS = {
+    "sem filtros": (None, [], None, None),
+    "tipo": ('Apartamento', [], None, None),
+    "3 bairros": (None, ['Aldeota', 'Meireles', 'Cocó'], None, None),
+    "SER": (None, [], 'SER2', None),
+    "preço 300-400 mil": (None, [], None, (300_000, 400_000)),
+    "preço 275-1.130 mil": (None, [], None, (275_000, 1_130_000)),
+    "todos os filtros": ('Apartamento', ['Aldeota', 'Meireles', 'Cocó'], 'SER2', (500_000, 2_000_000)),
+}
+
+
+def pandas_filter(df:pd.DataFrame, tipo, bairros, ser, preco):
+    """
+    Filtragem anterior do app: cópia do DataFrame e uma máscara por widget
+    """
+    df_filtrado = df.copy()
+    if ser is not None:
+        df_filtrado = df_filtrado[df_filtrado['ser'] == ser]
+    if tipo is not None:
+        df_filtrado = df_filtrado[df_filtrado['tipo'] == tipo]
+    if bairros:
+        df_filtrado = df_filtrado[df_filtrado['localizacao'].isin(bairros)]
+    low, high = preco or (df['preco'].min(), df['preco'].max())
+    return df_filtrado[(df_filtrado['preco'] >= low) & (df_filtrado['preco'] <= high)]
+
+
+def scaled(scale:int):
+    base = read_csv(PROCESSED_CSV)
+    df = pd.concat([base] * scale, ignore_index=True)
+    for col in ['tipo', 'localizacao', 'ser']:
+        df[col] = df[col].astype('category')
+    return df
+
+
+def duckdb_dashboard(df_filtrado:pd.DataFrame):
+    """
+    KPIs e rankings do dashboard com consultas DuckDB sobre as linhas filtradas
+    """
+    median = df_filtrado['preco'].median()
+    duckdb.sql("SELECT COUNT(*), SUM(preco) FROM df_filtrado").fetchall()
+    duckdb.sql(
+        "SELECT localizacao, ser, AVG(preco) AS preco_medio, COUNT(*) AS qt_imoveis FROM df_filtrado "
+        "GROUP BY localizacao, ser HAVING qt_imoveis > 20 ORDER BY preco_medio DESC LIMIT 10"
+    ).fetchall()
+    for order in ["DESC", "ASC"]:
+        duckdb.sql(
+            "WITH cte AS (SELECT localizacao, preco / area AS preco_m2 FROM df_filtrado GROUP BY localizacao, area, preco) "
+            "SELECT localizacao, AVG(preco_m2), COUNT(*) AS qt_imoveis FROM cte GROUP BY localizacao "
+            f"HAVING qt_imoveis > 20 ORDER BY 2 {order} LIMIT 10"
+        ).fetchall()
+    return median
+
+
+def cube_dashboard(cube:PriceCube, filters:dict, price:tuple):
+    selection = cube.select(filters, price)
+    totals = cube.totals(selection)
+    cube.ranking(selection, 'preco')
+    cube.ranking(selection, 'preco_m2')
+    cube.ranking(selection, 'preco_m2', ascending=True)
+    return totals['mediana']
+
+
+def best(fn, repeat:int):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return min(runs) * 1000
+
+
+def bench_filters(scales:list, repeat:int):
+    for scale in scales:
+        df = scaled(scale)
+
+        start = time.perf_counter()
+        index = FilterIndex(df)
+        build = time.perf_counter() - start
+
+        print(f"\n{len(df):,} linhas (índice montado em {build * 1000:.0f} ms)")
+        print(f"{'filtros':<20} {'linhas':>10} {'pandas (ms)':>12} {'índice (ms)':>12} {'índice + take (ms)':>19}")
+        for label, (tipo, bairros, ser, preco) in SCENARIOS.items():
+            filters = {'tipo': tipo, 'localizacao': bairros, 'ser': ser}
+            rows = index.select(filters, preco)
+            assert len(rows) == len(pandas_filter(df, tipo, bairros, ser, preco))
+            masks = best(lambda: pandas_filter(df, tipo, bairros, ser, preco), repeat)
+            selection = best(lambda: index.select(filters, preco), repeat)
+            take = best(lambda: df.take(index.select(filters, preco)), repeat)
+            print(f"{label:<20} {len(rows):>10,} {masks:>12.2f} {selection:>12.3f} {take:>19.2f}")
+
+
+def bench_cube(scales:list, repeat:int):
+    for scale in scales:
+        df = scaled(scale)
+        index = FilterIndex(df)
+
+        start = time.perf_counter()
+        cube = PriceCube(df, index)
+        build = time.perf_counter() - start
+
+        print(f"\n{len(df):,} linhas; cubo com {len(cube.cells):,} células montado em {build * 1000:.0f} ms")
+        print(f"{'filtros':<20} {'DuckDB (ms)':>12} {'cubo (ms)':>10} {'erro mediana':>13}")
+        for label, (tipo, bairros, ser, preco) in SCENARIOS.items():
+            filters = {'tipo': tipo, 'localizacao': bairros, 'ser': ser}
+            df_filtrado = df.take(index.select(filters, preco))
+            exact = duckdb_dashboard(df_filtrado)
+            error = abs(cube_dashboard(cube, filters, preco) / exact - 1)
+            scan = best(lambda: duckdb_dashboard(df_filtrado), repeat)
+            merged = best(lambda: cube_dashboard(cube, filters, preco), repeat)
+            print(f"{label:<20} {scan:>12.2f} {merged:>10.2f} {error:>13.2%}")
+
+
+def bench_report(repeat:int, path:Path):
+    df = read_csv(PROCESSED_CSV)
+    engine = QueryEngine(df, version=0)
+    # Cada repetição usa uma versão nova, para que as consultas não venham do cache do QueryEngine
+    versions = iter(range(1, 2 * repeat + 2))
+
+    def build():
+        engine.version = next(versions)
+        return build_figures(df, engine)
+
+    figures = build()
+    save_report(figures, 0, path)
+    size = path.stat().st_size
+    built = best(build, repeat)
+    loaded = best(lambda: read_report(0, path), repeat)
+    serialized = best(lambda: [fig.to_json() for fig in figures.values()], repeat)
+    path.unlink()
+
+    print(f"{len(figures)} figuras, {size / 1024:.0f} KiB em JSON")
+    print(f"{'montadas a partir dos dados (ms)':<36} {built:>10.1f}")
+    print(f"{'lidas do arquivo (ms)':<36} {loaded:>10.1f}")
+    print(f"{'serialização para o navegador (ms)':<36} {serialized:>10.1f}")
+
+
+def bench_scatter(scales:list, repeat:int):
+    print(f"{'linhas':>10} {'gráfico':<28} {'tempo (ms)':>11} {'JSON (KiB)':>11}")
+    for scale in scales:
+        df = scaled(scale)
+        charts = {
+            "px.scatter(trendline='ols')": lambda: px.scatter(df, x='area', y='preco', trendline='ols', render_mode='webgl'),
+            "plot_scatter (amostra)": lambda: plot_scatter(df, '', 'area', 'preco', 'Área (m²)', 'Preço (R$)'),
+            "plot_scatter (densidade)": lambda: plot_scatter(df, '', 'area', 'preco', 'Área (m²)', 'Preço (R$)', large='density'),
+        }
+        for label, chart in charts.items():
+            elapsed = best(lambda: chart().to_json(), repeat)
+            size = len(chart().to_json()) / 1024
+            print(f"{len(df):>10,} {label:<28} {elapsed:>11.1f} {size:>11,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="bench", required=True)
+    filters = sub.add_parser("filters", help="Máscaras do pandas x FilterIndex")
+    filters.add_argument("--scales", type=int, nargs="+", default=[1, 20, 200])
+    filters.add_argument("--repeat", type=int, default=5)
+    cube = sub.add_parser("cube", help="Consultas DuckDB nas linhas filtradas x PriceCube")
+    cube.add_argument("--scales", type=int, nargs="+", default=[1, 20, 200])
+    cube.add_argument("--repeat", type=int, default=5)
+    report = sub.add_parser("report", help="Figuras do relatório montadas x lidas de dashboard.report")
+    report.add_argument("--repeat", type=int, default=5)
+    scatter = sub.add_parser("scatter", help="px.scatter com trendline OLS x plot_scatter")
+    scatter.add_argument("--scales", type=int, nargs="+", default=[1, 20, 200])
+    scatter.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.bench == "filters":
+        bench_filters(args.scales, args.repeat)
+    elif args.bench == "cube":
+        bench_cube(args.scales, args.repeat)
+    elif args.bench == "report":
+        bench_report(args.repeat, ROOT / "data" / "state" / "report" / "benchmark.json")
+    elif args.bench == "scatter":
+        bench_scatter(args.scales, args.repeat)
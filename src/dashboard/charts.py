@@ -0,0 +1,243 @@
+"""
+Gráficos do dashboard e do relatório (Plotly Express)
+
+Os histogramas (plot_hist e plot_bars) são agrupados aqui com NumPy e enviados
+ao navegador como barras já contadas: o tamanho da página depende do número de
+classes, não do número de anúncios. O scatter plot (plot_scatter) usa WebGL,
+calcula a reta de tendência com NumPy e limita o número de pontos enviados.
+"""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+COLORS = ['#3d405b', '#00c6c2', '#168582', '#324b4a']
+
+# Número máximo de classes de um histograma sem nbins
+MAX_BINS = 100
+
+# Acima deste número de pontos, plot_scatter mostra uma amostra ou a densidade
+SCATTER_MAX_POINTS = 10_000
+
+# Classes por eixo da grade de densidade de plot_scatter
+DENSITY_BINS = 80
+
+
+def nice_size(size:float):
+    """
+    Menor largura de classe 1, 2, 2,5 ou 5 x 10^k maior ou igual a size
+    """
+    power = 10.0 ** np.floor(np.log10(size))
+    for step in [1, 2, 2.5, 5, 10]:
+        if step * power >= size:
+            return step * power
+
+
+def bin_edges(values:np.ndarray, nbins:int=None, max_bins:int=MAX_BINS):
+    """
+    Limites das classes de um histograma, com largura "redonda" (nice_size)
+
+    Parâmetros:
+        values: np.ndarray - Valores (sem nulos)
+        nbins: int - Número aproximado de classes, como o nbins do Plotly; sem ele, a
+            largura segue a regra automática do Plotly (2 desvios-padrão / n^0,4)
+        max_bins: int - Limite do número de classes quando nbins não é informado
+    """
+    low, high = float(values.min()), float(values.max())
+    if low == high:
+        return np.array([low - 0.5, high + 0.5])
+    if nbins:
+        size = (high - low) / nbins
+    else:
+        size = max(2 * values.std() / len(values) ** 0.4, (high - low) / max_bins)
+    size = nice_size(size)
+    start = np.floor(low / size) * size
+    count = int((high - start) // size) + 1
+    return start + size * np.arange(count + 1)
+
+
+def histogram_frame(data:pd.DataFrame, x:str, color:str=None, nbins:int=None):
+    """
+    Proporção (%) dos anúncios por classe de x, separada por color
+
+    Colunas numéricas de ponto flutuante são agrupadas em classes [início, fim)
+    comuns a todos os grupos de color (a coluna x recebe o centro da classe);
+    as demais colunas (categorias, inteiros, booleanos) têm uma barra por valor.
+    Como no histnorm='percent' do Plotly, cada grupo de color soma 100%.
+    """
+    column = data[x]
+    groups = data.groupby(color, observed=True, sort=False)[x] if color else [(None, column)]
+    edges = None
+    if pd.api.types.is_float_dtype(column):
+        values = column.dropna().to_numpy()
+        edges = bin_edges(values, nbins) if len(values) else np.array([0.0, 1.0])
+
+    frames = []
+    for name, group in groups:
+        if edges is not None:
+            counts, _ = np.histogram(group.dropna().to_numpy(), edges)
+            frame = pd.DataFrame({x: (edges[:-1] + edges[1:]) / 2, 'inicio': edges[:-1], 'fim': edges[1:], 'count': counts})
+        else:
+            counts = group.value_counts(sort=False)
+            counts = counts[counts > 0]
+            if not isinstance(counts.index, pd.CategoricalIndex):
+                counts = counts.sort_index()
+            frame = pd.DataFrame({x: counts.index.astype(object), 'count': counts.to_numpy()})
+        count = frame.pop('count')
+        frame['percent'] = 100 * count / max(count.sum(), 1)
+        if color:
+            frame[color] = name
+        frames.append(frame)
+
+    if not frames:
+        bins = ['inicio', 'fim'] if edges is not None else []
+        return pd.DataFrame(columns=[x, *bins, 'percent'] + ([color] if color else []))
+    return pd.concat(frames, ignore_index=True)
+
+
+def plot_hist(data:pd.DataFrame, x:str, color:str, title:str, xlabel:str, ylabel:str, nbins:int=40):
+    """
+    Cria um histograma (%) sobreposto por color, agrupado com histogram_frame
+    """
+    fig = px.bar(
+        histogram_frame(data, x, color, nbins),
+        x = x,
+        y = 'percent',
+        color = color,
+        barmode = 'overlay',
+        title = title,
+        hover_data = ['inicio', 'fim'],
+        labels = {x: xlabel.capitalize(), 'percent': ylabel, color: color.capitalize()},
+        color_discrete_sequence=COLORS
+    )
+
+    fig.update_layout(
+        plot_bgcolor = 'rgba(0, 0, 0, 0)',
+        xaxis_title = xlabel,
+        yaxis_title = ylabel,
+        bargap = 0.1
+    )
+
+    return fig
+
+
+def ols_line(x:np.ndarray, y:np.ndarray):
+    """
+    Reta de mínimos quadrados y = slope * x + intercept e o seu R², em forma fechada
+
+    Mesmos coeficientes do trendline='ols' do Plotly Express (statsmodels OLS com constante).
+    """
+    x_mean, y_mean = x.mean(), y.mean()
+    dx, dy = x - x_mean, y - y_mean
+    sxx, sxy, syy = dx @ dx, dx @ dy, dy @ dy
+    slope = sxy / sxx if sxx else 0.0
+    intercept = y_mean - slope * x_mean
+    rsquared = sxy * sxy / (sxx * syy) if sxx and syy else 0.0
+    return slope, intercept, rsquared
+
+
+def plot_scatter(data:pd.DataFrame, title:str, x:str, y:str, xlabel:str, ylabel:str,
+                 max_points:int=SCATTER_MAX_POINTS, large:str='sample'):
+    """
+    Cria um scatter plot (WebGL) com reta de tendência OLS
+
+    A reta é ajustada com todos os pontos (ols_line). Acima de max_points pontos,
+    o gráfico mostra uma amostra aleatória de max_points pontos (large='sample')
+    ou a contagem de pontos em uma grade de DENSITY_BINS x DENSITY_BINS
+    (large='density').
+    """
+    points = data[[x, y]].dropna()
+    xs, ys = points[x].to_numpy(dtype='float64'), points[y].to_numpy(dtype='float64')
+    labels = {x: xlabel, y: ylabel}
+
+    if len(points) > max_points and large == 'density':
+        counts, x_edges, y_edges = np.histogram2d(xs, ys, bins=DENSITY_BINS)
+        fig = px.imshow(
+            np.where(counts.T > 0, counts.T, np.nan),
+            x=(x_edges[:-1] + x_edges[1:]) / 2,
+            y=(y_edges[:-1] + y_edges[1:]) / 2,
+            origin='lower',
+            aspect='auto',
+            title=title,
+            labels={'x': xlabel, 'y': ylabel, 'color': 'Imóveis'},
+            color_continuous_scale=['#00c6c2', '#168582', '#324b4a'],
+        )
+    else:
+        if len(points) > max_points:
+            rows = np.sort(np.random.default_rng(0).choice(len(points), max_points, replace=False))
+            points = points.iloc[rows]
+        fig = px.scatter(
+            points,
+            x=x,
+            y=y,
+            title=title,
+            labels=labels,
+            render_mode='webgl',
+            color_discrete_sequence=['#00c6c2', '#168582', '#324b4a'],
+            opacity=0.30
+        )
+
+    if len(xs) > 1:
+        slope, intercept, rsquared = ols_line(xs, ys)
+        line_x = np.array([xs.min(), xs.max()])
+        fig.add_scattergl(
+            x=line_x,
+            y=slope * line_x + intercept,
+            mode='lines',
+            line_color='#9c5a5d',
+            showlegend=False,
+            hovertemplate=(f"<b>OLS trendline</b><br>{y} = {slope:g} * {x} + {intercept:g}<br>R<sup>2</sup>={rsquared:f}<br><br>"
+                           f"{xlabel}=%{{x}}<br>{ylabel}=%{{y}} <b>(trend)</b><extra></extra>"),
+        )
+
+    fig.update_layout(
+        plot_bgcolor = 'rgba(0, 0, 0, 0)',
+        xaxis_title = xlabel,
+        yaxis_title = ylabel,
+    )
+
+    return fig
+
+
+def plot_bar(data:pd.DataFrame, title:str, x:str, y:str, xlabel:str, ylabel:str):
+    """
+    Cria um gráfico de barras utilizando Plotly Express
+    """
+    fig = px.histogram(
+        data,
+        x=x,
+        y=y,
+        title=title,
+        color_discrete_sequence=COLORS
+    )
+
+    fig.update_layout(
+        plot_bgcolor = 'rgba(0, 0, 0, 0)',
+        xaxis_title=xlabel,
+        yaxis_title=ylabel
+    )
+
+    return fig
+
+
+def plot_bars(data:pd.DataFrame, title:str, x:str, xlabel:str, ylabel:str):
+    """
+    Cria um gráfico de barras (%) da distribuição de x, agrupado com histogram_frame
+    """
+    frame = histogram_frame(data, x)
+    fig = px.bar(
+        frame,
+        x=x,
+        y='percent',
+        title=title,
+        hover_data=['inicio', 'fim'] if 'inicio' in frame else None,
+        color_discrete_sequence=COLORS
+    )
+
+    fig.update_layout(
+        plot_bgcolor = 'rgba(0, 0, 0, 0)',
+        xaxis_title=xlabel,
+        yaxis_title=ylabel,
+        bargap=0.1
+    )
+
+    return fig
@@ -0,0 +1,284 @@
+"""
+Cubo pré-agregado dos KPIs e rankings do dashboard
+
+Células: (tipo, localizacao, ser, faixa de preço), com as faixas de PRICE_EDGES.
+Cada célula guarda:
+    - qt_imoveis e soma_preco: total de imóveis, volume de vendas e preço médio;
+    - um sketch de quantis do preço: contagem por balde logarítmico, com
+      limites fixos (iguais em todas as células), então o sketch de qualquer
+      conjunto de células é a soma dos sketches.
+
+O preço médio do m² conta uma vez os anúncios repetidos com o mesmo bairro,
+área e preço, como a consulta original. Esses grupos ficam em células próprias
+(pares, localizacao, faixa de preço), em que pares é o conjunto de (tipo, ser)
+das linhas do grupo: um grupo entra na média quando algum desses pares passa
+pelos filtros de tipo e SER.
+
+Qualquer combinação dos filtros da barra lateral é respondida somando células.
+O filtro de preço aceita limites quaisquer: as faixas inteiramente dentro do
+intervalo vêm das células, e as duas faixas das pontas, só em parte dentro do
+intervalo, das linhas selecionadas por FilterIndex (cada linha entra no sketch
+pelo seu balde). Contagens, somas e médias são exatas. A mediana vem do sketch:
+cada balde cobre (γ^(i-1), γ^i], com γ = (1 + SKETCH_ALPHA) / (1 - SKETCH_ALPHA),
+e é representado por 2γ^i / (γ + 1), que fica a no máximo SKETCH_ALPHA (1%) de
+qualquer preço do balde. A mediana estimada fica, portanto, a no máximo 1% da
+mediana exata (média dos dois valores centrais quando a quantidade é par).
+"""
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from dashboard.filters import CATEGORIES, FilterIndex
+
+# Limites das faixas de preço (R$); a última faixa vai até o infinito
+PRICE_EDGES = [0, 100_000, 150_000, 200_000, 250_000, 300_000, 350_000, 400_000, 450_000, 500_000,
+               600_000, 700_000, 800_000, 900_000, 1_000_000, 1_250_000, 1_500_000, 1_750_000, 2_000_000,
+               2_500_000, 3_000_000, 4_000_000, 5_000_000, 7_500_000, 10_000_000, 15_000_000, 20_000_000, np.inf]
+
+SKETCH_ALPHA = 0.01
+GAMMA = (1 + SKETCH_ALPHA) / (1 - SKETCH_ALPHA)
+
+
+def sketch_bucket(values:np.ndarray):
+    """
+    Balde do sketch de cada valor (valores menores que 1 vão para o balde 0)
+    """
+    return np.ceil(np.log(np.maximum(values, 1)) / np.log(GAMMA)).astype('int64')
+
+
+def sketch_value(buckets:np.ndarray):
+    """
+    Valor representativo de cada balde (erro relativo de até SKETCH_ALPHA)
+    """
+    return 2 * GAMMA ** buckets / (GAMMA + 1)
+
+
+def price_band(prices:np.ndarray):
+    """
+    Faixa de PRICE_EDGES de cada preço (a faixa i é [PRICE_EDGES[i], PRICE_EDGES[i + 1]))
+    """
+    return np.searchsorted(PRICE_EDGES, prices, side='right') - 1
+
+
+def values_filter(filters:dict, col:str):
+    """
+    Valores selecionados de uma coluna nos filtros da barra lateral; None se a coluna não é filtrada
+    """
+    value = (filters or {}).get(col)
+    if value is None or (not isinstance(value, str) and not len(value)):
+        return None
+    return {value} if isinstance(value, str) else set(value)
+
+
+class Selection(NamedTuple):
+    """
+    Resultado de PriceCube.select: células das faixas inteiras e linhas das faixas das pontas
+    """
+    cells: np.ndarray
+    m2_cells: np.ndarray
+    rows: np.ndarray
+
+
+class PriceCube:
+    """
+    Cubo (tipo, localizacao, ser, faixa de preço) de um DataFrame do dashboard
+
+    Parâmetros:
+        df: pd.DataFrame - Dados com tipo, localizacao, ser, area e preco
+        index: FilterIndex - Índice das linhas de df, para as faixas das pontas (padrão: um novo)
+    """
+    def __init__(self, df:pd.DataFrame, index:FilterIndex=None):
+        data = pd.DataFrame({col: pd.Categorical(df[col].astype(str)) for col in CATEGORIES})
+        data['area'] = df['area'].to_numpy(dtype='float64')
+        data['preco'] = df['preco'].to_numpy(dtype='float64')
+        data['faixa'] = price_band(data['preco'].to_numpy())
+        data['bucket'] = sketch_bucket(data['preco'].to_numpy())
+        self.labels = {col: data[col].cat.categories for col in CATEGORIES}
+
+        keys = CATEGORIES + ['faixa']
+        grouped = data.groupby(keys, observed=True, sort=True)
+        self.cells = grouped.agg(qt_imoveis=('preco', 'size'), soma_preco=('preco', 'sum')).reset_index()
+
+        # Sketch esparso: (célula, balde, contagem), com os baldes deslocados para começar em 0
+        cell = grouped.ngroup().to_numpy()
+        sketch = pd.DataFrame({'cell': cell, 'bucket': data['bucket']}).value_counts().sort_index()
+        self.sketch_cell = sketch.index.get_level_values('cell').to_numpy()
+        buckets = sketch.index.get_level_values('bucket').to_numpy()
+        self.bucket_offset = int(buckets.min()) if len(buckets) else 0
+        self.sketch_bucket = buckets - self.bucket_offset
+        self.sketch_count = sketch.to_numpy()
+        self.buckets = int(self.sketch_bucket.max()) + 1 if len(buckets) else 0
+
+        self.index = FilterIndex(self.cells, price='faixa')
+        self.cell_codes = {col: self.cells[col].cat.codes.to_numpy().astype('int64') for col in CATEGORIES}
+        self.build_m2(data)
+
+        # Linhas, para as faixas de preço só em parte dentro do filtro
+        self.rows = index or FilterIndex(df)
+        self.row_codes = {col: data[col].cat.codes.to_numpy().astype('int64') for col in CATEGORIES}
+        self.row_preco = data['preco'].to_numpy()
+        self.row_preco_m2 = self.row_preco / data['area'].to_numpy()
+        self.row_bucket = data['bucket'].to_numpy() - self.bucket_offset
+        self.price_range = self.rows.price_range()
+
+    def build_m2(self, data:pd.DataFrame):
+        """
+        Células do preço do m²: grupos (localizacao, area, preco) somados por (pares, localizacao, faixa)
+
+        Os pares (tipo, ser) são guardados como tipo * número de SERs + ser, com os
+        códigos de self.labels.
+        """
+        self.row_group = data.groupby(['localizacao', 'area', 'preco'], observed=True, sort=False).ngroup().to_numpy()
+        pair = data['tipo'].cat.codes.to_numpy().astype('int64') * len(self.labels['ser']) + data['ser'].cat.codes.to_numpy()
+        pairs = pd.DataFrame({'group': self.row_group, 'par': pair}).drop_duplicates().sort_values(['group', 'par'])
+        bounds = np.flatnonzero(np.diff(pairs['group'].to_numpy())) + 1
+        signatures = [tuple(chunk.tolist()) for chunk in np.split(pairs['par'].to_numpy(), bounds)] if len(pairs) else []
+        self.m2_pairs = sorted(set(signatures))
+        lookup = {signature: code for code, signature in enumerate(self.m2_pairs)}
+        codes = [lookup[signature] for signature in signatures]
+
+        first = data.groupby(self.row_group, sort=True)[['localizacao', 'faixa', 'area', 'preco']].first()
+        groups = pd.DataFrame({
+            'pares': codes,
+            'localizacao': first['localizacao'].array,
+            'faixa': first['faixa'].to_numpy(),
+            'preco_m2': (first['preco'] / first['area']).to_numpy(),
+        })
+        self.m2_cells = groups.groupby(['pares', 'localizacao', 'faixa'], observed=True, sort=True).agg(
+            qt_m2=('preco_m2', 'size'),
+            soma_preco_m2=('preco_m2', 'sum'),
+        ).reset_index()
+        self.m2_index = FilterIndex(self.m2_cells, categories=['localizacao'], price='faixa')
+        self.m2_codes = self.m2_cells['localizacao'].cat.codes.to_numpy().astype('int64')
+
+    def select(self, filters:dict=None, price:tuple=None):
+        """
+        Células e linhas que atendem aos filtros
+
+        Parâmetros:
+            filters: dict - {coluna: valor ou lista}, como em FilterIndex.select
+            price: tuple - (mínimo, máximo) do preço, inclusive; None não filtra
+        """
+        if price is not None and price[0] <= self.price_range[0] and price[1] >= self.price_range[1]:
+            price = None
+        if price is None:
+            return Selection(self.index.select(filters), self.select_m2(filters, None), np.array([], dtype='int64'))
+
+        # Faixas inteiramente dentro do intervalo: PRICE_EDGES[first] >= mínimo e PRICE_EDGES[last + 1] <= máximo
+        first = int(np.searchsorted(PRICE_EDGES, price[0], side='left'))
+        last = int(np.searchsorted(PRICE_EDGES, price[1], side='right')) - 2
+        if last < first:
+            empty = np.array([], dtype='int64')
+            return Selection(empty, empty, self.rows.select(filters, price))
+
+        low = self.rows.select(filters, (price[0], np.nextafter(PRICE_EDGES[first], -np.inf)))
+        high = self.rows.select(filters, (PRICE_EDGES[last + 1], price[1]))
+        bands = (first, last)
+        return Selection(self.index.select(filters, bands), self.select_m2(filters, bands), np.concatenate([low, high]))
+
+    def select_m2(self, filters:dict, bands:tuple):
+        """
+        Posições das células do preço do m² com algum par (tipo, ser) que passa pelos filtros
+        """
+        cells = self.m2_index.select({'localizacao': (filters or {}).get('localizacao')}, bands)
+        tipos, sers = values_filter(filters, 'tipo'), values_filter(filters, 'ser')
+        if tipos is None and sers is None:
+            return cells
+
+        allowed = {}
+        for col, values in [('tipo', tipos), ('ser', sers)]:
+            allowed[col] = np.ones(len(self.labels[col]), dtype=bool)
+            if values is not None:
+                allowed[col] = self.labels[col].isin(values)
+        pair_ok = np.outer(allowed['tipo'], allowed['ser']).ravel()
+        selected = np.array([pair_ok[list(pairs)].any() for pairs in self.m2_pairs], dtype=bool)
+        return cells[selected[self.m2_cells['pares'].to_numpy()[cells]]]
+
+    def totals(self, selection:Selection):
+        """
+        Total de imóveis, volume de vendas e mediana estimada do preço da seleção
+        """
+        selected = self.cells.iloc[selection.cells]
+        return {
+            'qt_imoveis': int(selected['qt_imoveis'].sum()) + len(selection.rows),
+            'soma_preco': float(selected['soma_preco'].sum() + self.row_preco[selection.rows].sum()),
+            'mediana': self.quantile(selection, 0.5),
+        }
+
+    def quantile(self, selection:Selection, q:float):
+        """
+        Quantil q do preço da seleção, pelo sketch (erro relativo de até SKETCH_ALPHA)
+        """
+        mask = np.zeros(len(self.cells), dtype=bool)
+        mask[selection.cells] = True
+        rows = mask[self.sketch_cell]
+        counts = np.bincount(self.sketch_bucket[rows], weights=self.sketch_count[rows], minlength=self.buckets)
+        counts += np.bincount(self.row_bucket[selection.rows], minlength=self.buckets)
+        total = counts.sum()
+        if total == 0:
+            return float('nan')
+
+        # Mesma posição do quantil do pandas: interpolação entre os elementos vizinhos
+        rank = q * (total - 1)
+        cumulative = np.cumsum(counts)
+        low, high = np.searchsorted(cumulative, [np.floor(rank) + 1, np.ceil(rank) + 1])
+        values = sketch_value(np.array([low, high]) + self.bucket_offset)
+        return float(values[0] + (values[1] - values[0]) * (rank - np.floor(rank)))
+
+    def ranking(self, selection:Selection, measure:str='preco', min_imoveis:int=20, ascending:bool=False, limit:int=10):
+        """
+        Bairros ordenados pela média de preco ou preco_m2 na seleção
+
+        Parâmetros:
+            selection: Selection - Células e linhas selecionadas (ver select())
+            measure: str - 'preco' (preço médio, por bairro e SER) ou 'preco_m2' (preço médio do m², por bairro)
+            min_imoveis: int - Bairros com até este número de imóveis ficam de fora
+            ascending: bool - Ordem crescente
+            limit: int - Número de bairros
+        """
+        cells, rows = selection.cells, selection.rows
+        bairros, n_ser = self.labels['localizacao'], len(self.labels['ser'])
+        if measure == 'preco':
+            # Chave (bairro, SER) = bairro * número de SERs + ser
+            size = len(bairros) * n_ser
+            cell_keys = self.cell_codes['localizacao'][cells] * n_ser + self.cell_codes['ser'][cells]
+            row_keys = self.row_codes['localizacao'][rows] * n_ser + self.row_codes['ser'][rows]
+            count = (np.bincount(cell_keys, weights=self.cells['qt_imoveis'].to_numpy()[cells], minlength=size)
+                     + np.bincount(row_keys, minlength=size))
+            total = (np.bincount(cell_keys, weights=self.cells['soma_preco'].to_numpy()[cells], minlength=size)
+                     + np.bincount(row_keys, weights=self.row_preco[rows], minlength=size))
+            keys = np.flatnonzero(count)
+            grouped = pd.DataFrame({
+                'localizacao': bairros[keys // n_ser],
+                'ser': self.labels['ser'][keys % n_ser],
+                'qt_imoveis': count[keys].astype('int64'),
+                'soma_preco': total[keys],
+            })
+            grouped['preco_medio'] = grouped['soma_preco'] / grouped['qt_imoveis']
+            column = 'preco_medio'
+        elif measure == 'preco_m2':
+            # As linhas das pontas não têm grupos (localizacao, area, preco) em comum
+            # com as células, porque o preço define a faixa
+            _, first = np.unique(self.row_group[rows], return_index=True)
+            rows = rows[first]
+            size = len(bairros)
+            cell_keys, row_keys = self.m2_codes[selection.m2_cells], self.row_codes['localizacao'][rows]
+            count = (np.bincount(cell_keys, weights=self.m2_cells['qt_m2'].to_numpy()[selection.m2_cells], minlength=size)
+                     + np.bincount(row_keys, minlength=size))
+            total = (np.bincount(cell_keys, weights=self.m2_cells['soma_preco_m2'].to_numpy()[selection.m2_cells], minlength=size)
+                     + np.bincount(row_keys, weights=self.row_preco_m2[rows], minlength=size))
+            keys = np.flatnonzero(count)
+            grouped = pd.DataFrame({
+                'localizacao': bairros[keys],
+                'qt_imoveis': count[keys].astype('int64'),
+                'soma_preco_m2': total[keys],
+            })
+            grouped['avg_preco_m2'] = grouped['soma_preco_m2'] / grouped['qt_imoveis']
+            column = 'avg_preco_m2'
+        else:
+            raise ValueError(f"Medida desconhecida: {measure}")
+
+        grouped = grouped[grouped['qt_imoveis'] > min_imoveis]
+        grouped = grouped.sort_values(column, ascending=ascending, kind='stable').head(limit)
+        return grouped.reset_index(drop=True)
@@ -0,0 +1,33 @@
+"""
+Dados do dashboard: leitura dos dados tratados e versão dos arquivos lidos
+"""
+from pathlib import Path
+
+from transform.schema import read_csv
+from transform.storage import dataset_dir, dataset_exists, read_dataset
+
+ROOT = Path(__file__).resolve().parents[2]
+PROCESSED_CSV = ROOT / "data" / "processed" / "clean_data.csv"
+
+
+def load_processed(ser:str=None):
+    """
+    Carrega os dados em um pd.DataFrame com os tipos de transform.schema
+
+    Usa o dataset Parquet processed (transform.storage) quando ele existe; com
+    ser, apenas a partição daquela SER é lida.
+    """
+    if dataset_exists("processed"):
+        return read_dataset("processed", filters={'ser': ser} if ser else None)
+    df = read_csv(PROCESSED_CSV)
+    if ser:
+        df = df[df['ser'] == ser].reset_index(drop=True)
+    return df
+
+
+def data_version():
+    """
+    Versão dos dados de load_processed(): o mtime mais recente dos arquivos lidos
+    """
+    files = list(dataset_dir("processed").rglob("*.parquet")) or [PROCESSED_CSV]
+    return max(f.stat().st_mtime_ns for f in files)
@@ -0,0 +1,109 @@
+"""
+Índice de filtros do dashboard (tipo, bairro, SER e faixa de preço)
+
+O índice é montado uma vez por versão dos dados e responde aos filtros da barra
+lateral com as posições das linhas selecionadas, sem copiar o DataFrame:
+    - tipo, localizacao e ser: um bitmap (np.packbits) por categoria; valores
+      da mesma coluna são combinados com OR e colunas diferentes com AND;
+    - preco: as posições ordenadas pelo preço, e a faixa é encontrada por busca
+      binária (np.searchsorted).
+"""
+import numpy as np
+import pandas as pd
+
+CATEGORIES = ['tipo', 'localizacao', 'ser']
+
+# Abaixo desta fração das linhas, a faixa de preço é usada como lista de
+# candidatos e os bitmaps são consultados só nessas posições
+SELECTIVE = 1 / 16
+
+
+class FilterIndex:
+    """
+    Bitmaps das colunas categóricas e índice ordenado do preço de um DataFrame
+
+    Parâmetros:
+        df: pd.DataFrame - Dados do dashboard (não são copiados nem guardados)
+        categories: list - Colunas com um bitmap por valor
+        price: str - Coluna do índice ordenado
+    """
+    def __init__(self, df:pd.DataFrame, categories:list=CATEGORIES, price:str='preco'):
+        self.size = len(df)
+        self.bitmaps = {}
+        for col in categories:
+            codes, values = pd.factorize(df[col], sort=True)
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(values) + 1))
+            self.bitmaps[col] = {
+                value: self.bitmap(order[bounds[code]:bounds[code + 1]])
+                for code, value in enumerate(values)
+            }
+
+        self.prices = df[price].to_numpy(dtype='float64')
+        self.order = np.argsort(self.prices, kind='stable')
+        self.sorted_prices = self.prices[self.order]
+        self.empty = np.zeros((self.size + 7) // 8, dtype='uint8')
+
+    def bitmap(self, rows:np.ndarray):
+        mask = np.zeros(self.size, dtype=bool)
+        mask[rows] = True
+        return np.packbits(mask)
+
+    def values(self, col:str):
+        """
+        Valores de uma coluna categórica, em ordem
+        """
+        return list(self.bitmaps[col])
+
+    def price_range(self):
+        return (self.sorted_prices[0], self.sorted_prices[-1]) if self.size else (0.0, 0.0)
+
+    def category_mask(self, filters:dict):
+        """
+        Bitmap dos filtros {coluna: valor ou lista de valores}; None se não há filtro
+        """
+        mask = None
+        for col, selected in filters.items():
+            if selected is None:
+                continue
+            selected = [selected] if isinstance(selected, str) else list(selected)
+            bitmaps = self.bitmaps[col]
+            column = self.empty.copy()
+            for value in selected:
+                np.bitwise_or(column, bitmaps.get(value, self.empty), out=column)
+            mask = column if mask is None else np.bitwise_and(mask, column, out=mask)
+        return mask
+
+    def select(self, filters:dict=None, price:tuple=None):
+        """
+        Posições (ordenadas) das linhas que passam pelos filtros
+
+        Parâmetros:
+            filters: dict - {coluna: valor ou lista}; None ou lista vazia não filtra a coluna
+            price: tuple - (mínimo, máximo) do preço, inclusive; None não filtra
+        """
+        filters = {col: value for col, value in (filters or {}).items()
+                   if value is not None and (isinstance(value, str) or len(value))}
+        mask = self.category_mask(filters)
+
+        low, high = 0, self.size
+        if price is not None:
+            low = np.searchsorted(self.sorted_prices, price[0], side='left')
+            high = np.searchsorted(self.sorted_prices, price[1], side='right')
+        in_range = high - low
+
+        if mask is None:
+            if in_range == self.size:
+                return np.arange(self.size)
+            return np.sort(self.order[low:high])
+
+        if in_range < self.size * SELECTIVE:
+            candidates = np.sort(self.order[low:high])
+            bits = (mask[candidates >> 3] >> (7 - (candidates & 7))) & 1
+            return candidates[bits.astype(bool)]
+
+        rows = np.flatnonzero(np.unpackbits(mask, count=self.size))
+        if in_range < self.size:
+            prices = self.prices[rows]
+            rows = rows[(prices >= price[0]) & (prices <= price[1])]
+        return rows
@@ -0,0 +1,161 @@
+"""
+Consultas DuckDB do dashboard com cache de resultados compartilhado entre as sessões
+
+O app abre um QueryEngine por processo e por versão dos dados (st.cache_resource):
+os dados são copiados uma vez para a tabela imoveis de uma conexão DuckDB em
+memória, e cada consulta roda em um cursor próprio dessa conexão (as sessões do
+Streamlit rodam em threads diferentes). Os resultados ficam em um cache LRU
+limitado, com chave (versão dos dados, SQL, estado dos filtros): usuários com os
+mesmos filtros recebem o mesmo DataFrame, que não deve ser alterado. Pedidos
+simultâneos da mesma consulta esperam a primeira execução em vez de repeti-la.
+
+Nas consultas, {where} é substituído pelos filtros (ver where()):
+    engine.query("SELECT ser, COUNT(*) FROM imoveis {where} GROUP BY ser", filters={'tipo': 'Casa'})
+
+A tabela de anúncios do dashboard é paginada aqui (QueryEngine.page()): cada
+página é um ORDER BY ... LIMIT/OFFSET, e só as linhas da página vão para o
+navegador.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import duckdb
+import pandas as pd
+
+TABLE = "imoveis"
+
+
+def freeze(value):
+    """
+    Versão imutável (e usável como chave) de filtros com listas e dicts
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def where(filters:dict=None, price:tuple=None):
+    """
+    Cláusula WHERE e parâmetros dos filtros da barra lateral
+
+    Parâmetros:
+        filters: dict - {coluna: valor ou lista}; None ou lista vazia não filtra a coluna
+        price: tuple - (mínimo, máximo) do preço, inclusive
+    """
+    conditions, params = [], []
+    for col, value in (filters or {}).items():
+        if value is None or (not isinstance(value, str) and not len(value)):
+            continue
+        values = [value] if isinstance(value, str) else list(value)
+        conditions.append(f"{col} IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+    if price is not None:
+        conditions.append("preco BETWEEN ? AND ?")
+        params.extend(float(limit) for limit in price)
+    return ("WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+
+class QueryEngine:
+    """
+    Conexão DuckDB com os dados do dashboard e cache LRU dos resultados
+
+    Parâmetros:
+        df: pd.DataFrame - Dados do dashboard, copiados para a tabela imoveis
+        version: int - Versão dos dados (parte da chave do cache)
+        max_entries: int - Número máximo de resultados no cache
+    """
+    def __init__(self, df:pd.DataFrame, version:int, max_entries:int=256):
+        self.version = version
+        self.max_entries = max_entries
+        self.con = duckdb.connect()
+        self.con.register("dados", df)
+        self.con.execute(f"CREATE TABLE {TABLE} AS SELECT * FROM dados")
+        self.con.unregister("dados")
+        self.columns = list(df.columns)
+        self.cache = OrderedDict()
+        self.running = {}
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def query(self, sql:str, filters:dict=None, price:tuple=None, params:list=None):
+        """
+        Resultado da consulta como pd.DataFrame, do cache quando possível
+
+        Parâmetros:
+            sql: str - Consulta sobre a tabela imoveis; {where} recebe os filtros
+            filters: dict - Filtros da barra lateral (ver where())
+            price: tuple - Faixa de preço (ver where())
+            params: list - Parâmetros da consulta, depois dos parâmetros dos filtros
+        """
+        key = (self.version, sql, freeze(filters), freeze(price), freeze(params))
+        owner = False
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return self.cache[key]
+            if key in self.running:
+                self.hits += 1
+                future = self.running[key]
+            else:
+                self.misses += 1
+                future = self.running[key] = Future()
+                owner = True
+        if not owner:
+            return future.result()
+
+        try:
+            clause, values = where(filters, price)
+            cursor = self.con.cursor()
+            try:
+                result = cursor.execute(sql.format(where=clause), values + list(params or [])).df()
+            finally:
+                cursor.close()
+        except Exception as e:
+            with self.lock:
+                del self.running[key]
+            future.set_exception(e)
+            raise
+
+        with self.lock:
+            del self.running[key]
+            self.cache[key] = result
+            while len(self.cache) > self.max_entries:
+                self.cache.popitem(last=False)
+        future.set_result(result)
+        return result
+
+    def count(self, filters:dict=None, price:tuple=None):
+        """
+        Número de linhas que atendem aos filtros (ver where())
+        """
+        return int(self.query(f"SELECT COUNT(*) AS n FROM {TABLE} {{where}}", filters, price)['n'].iloc[0])
+
+    def page(self, filters:dict=None, price:tuple=None, order_by:str='preco', descending:bool=False,
+             page:int=1, page_size:int=50):
+        """
+        Uma página das linhas que atendem aos filtros, ordenadas por order_by
+
+        Empates são desfeitos pela ordem das linhas na tabela (rowid), então as
+        páginas não se sobrepõem.
+
+        Parâmetros:
+            filters: dict - Filtros da barra lateral (ver where())
+            price: tuple - Faixa de preço (ver where())
+            order_by: str - Coluna da ordenação
+            descending: bool - Ordem decrescente
+            page: int - Número da página, a partir de 1
+            page_size: int - Linhas por página
+        """
+        if order_by not in self.columns:
+            raise ValueError(f"Coluna desconhecida: {order_by}")
+        direction = "DESC" if descending else "ASC"
+        sql = (f"SELECT * FROM {TABLE} {{where}} ORDER BY {order_by} {direction} NULLS LAST, rowid "
+               "LIMIT ? OFFSET ?")
+        return self.query(sql, filters, price, [page_size, (max(page, 1) - 1) * page_size])
+
+    def close(self):
+        self.con.close()
@@ -0,0 +1,146 @@
+"""
+Figuras da aba "📝 Report", geradas uma vez por versão dos dados
+
+Executar a partir da raiz do repositório (também é a etapa report de src/pipeline.py):
+    python src/dashboard/report.py
+
+O relatório não depende dos filtros da barra lateral. As figuras são montadas a
+partir dos dados tratados e gravadas em data/state/report/report.json, junto
+com a versão dos dados (dashboard.data.data_version()) e do código dos gráficos.
+O app carrega esse arquivo uma vez por processo e versão dos dados; se ele não
+existir ou for de outra versão, as figuras são montadas e o arquivo é regravado.
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+import plotly.graph_objects as go
+from plotly.utils import PlotlyJSONEncoder
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dashboard.charts import plot_bar, plot_bars, plot_hist
+from dashboard.data import ROOT, data_version, load_processed
+from dashboard.queries import QueryEngine
+
+REPORT_FILE = ROOT / "data" / "state" / "report" / "report.json"
+
+# Arquivos que definem as figuras: alterá-los invalida o relatório gravado
+CODE = [ROOT / "src" / "dashboard" / "charts.py", Path(__file__).resolve()]
+
+BAIRROS_SQL = "SELECT localizacao, COUNT(localizacao) AS count FROM imoveis GROUP BY localizacao ORDER BY 2 DESC LIMIT 10"
+
+SER_SQL = "SELECT ser, COUNT(ser) AS count FROM imoveis GROUP BY ser ORDER BY 2 DESC"
+
+PRECO_BAIRRO_SQL = """
+    SELECT
+        localizacao
+        , AVG(preco)::DECIMAL(18, 2) AS preco_medio
+        , COUNT(localizacao) AS qt_imoveis
+    FROM imoveis
+    GROUP BY localizacao
+    HAVING qt_imoveis > 20
+    ORDER BY 2 DESC
+    LIMIT 10
+"""
+
+PRECO_M2_SQL = """
+    WITH cte AS (
+        SELECT
+            localizacao
+            , preco/area AS preco_m2
+        FROM imoveis
+        GROUP BY localizacao, area, preco
+    )
+    SELECT
+        localizacao
+        , AVG(preco_m2) AS avg_preco_m2
+        , COUNT(localizacao) AS qt_imoveis
+    FROM cte
+    GROUP BY localizacao
+    HAVING qt_imoveis > 20
+    ORDER BY 2 DESC
+    LIMIT 10
+"""
+
+
+def build_figures(df, engine:QueryEngine):
+    """
+    Figuras do relatório, na ordem em que aparecem na aba
+
+    Parâmetros:
+        df: pd.DataFrame - Dados tratados (colunas ordinais e filtro de tipos já aplicados)
+        engine: QueryEngine - Conexão com os mesmos dados, para as consultas dos rankings
+    """
+    return {
+        'tipos': plot_bars(df, 'Proporção por Tipo de Imóvel', 'tipo', 'Tipo', 'Proporção (%)'),
+        'bairros': plot_bar(engine.query(BAIRROS_SQL), 'Distribuição de Imóveis por Bairro', 'localizacao', 'count', 'Bairro', 'Contagem'),
+        'ser': plot_bar(engine.query(SER_SQL), 'Distribuição de Imóveis por SER', 'ser', 'count',
+                        'Secretaria Regional Executiva Executiva Regional', 'Contagem'),
+        'quartos': plot_bars(df, 'Distribuição de Quartos', 'quartos_ord', 'Quartos', 'Proporção (%)'),
+        'banheiros': plot_bars(df, 'Distribuição de Banheiros', 'banheiros_ord', 'Banheiros', 'Proporção (%)'),
+        'vagas': plot_bars(df, 'Distribuição de Vagas', 'vagas_ord', 'Vagas', 'Proporção (%)'),
+        'preco': plot_bars(df, 'Distribuição por Preço de Oferta', 'preco', 'Preço (R$)', 'Proporção (%)'),
+        'preco_5mi': plot_bars(df[df['preco'] <= 5_000_000], 'Distribuição por Preço de Oferta (até R$ 5mi)', 'preco',
+                               'Preço (R$)', 'Proporção (%)'),
+        'preco_tipo': plot_hist(df[df['preco'] <= 1_000_000], 'preco', 'tipo', 'Distribuição Preço x Tipo', 'Preço (R$)', 'Proporção (%)'),
+        'preco_bairro': plot_bar(engine.query(PRECO_BAIRRO_SQL), 'Preço Médio por Bairro (Top 10)', 'localizacao', 'preco_medio',
+                                 'Baiirro', 'Preço (R$)'),
+        'preco_m2_bairro': plot_bar(engine.query(PRECO_M2_SQL), 'Preço Médio m² por Bairro (Top 10)', 'localizacao', 'avg_preco_m2',
+                                    'Bairro', 'Preço (R$/m²)'),
+    }
+
+
+def code_version():
+    """
+    Versão do código das figuras: o mtime mais recente dos arquivos de CODE
+    """
+    return max(f.stat().st_mtime_ns for f in CODE)
+
+
+def save_report(figures:dict, version:int, path:Path=REPORT_FILE):
+    """
+    Grava as figuras (especificação JSON do Plotly) e a versão dos dados
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    specs = {name: fig.to_plotly_json() for name, fig in figures.items()}
+    report = {'version': version, 'code': code_version(), 'figures': specs}
+    tmp.write_text(json.dumps(report, cls=PlotlyJSONEncoder))
+    tmp.replace(path)
+
+
+def read_report(version:int, path:Path=REPORT_FILE):
+    """
+    Figuras gravadas para esta versão dos dados, ou None
+    """
+    if not path.exists():
+        return None
+    report = json.loads(path.read_text())
+    if report.get('version') != version or report.get('code') != code_version():
+        return None
+    # As especificações vieram de figuras já validadas em build_figures(); validar de
+    # novo custa mais que montar o relatório a partir dos dados
+    return {name: go.Figure(spec, _validate=False) for name, spec in report['figures'].items()}
+
+
+def load_report(version:int, df, engine:QueryEngine, path:Path=REPORT_FILE):
+    """
+    Figuras do relatório para a versão dos dados: do arquivo, ou montadas e gravadas
+    """
+    figures = read_report(version, path)
+    if figures is None:
+        figures = build_figures(df, engine)
+        save_report(figures, version, path)
+    return figures
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    version = data_version()
+    df = load_processed()
+    figures = build_figures(df, QueryEngine(df, version))
+    save_report(figures, version)
+    print(f"{len(figures)} figuras salvas em {REPORT_FILE.relative_to(ROOT)} ({time.perf_counter() - start:.2f}s)")
@@ -0,0 +1,45 @@
+"""
+Benchmark do cache HTTP offline-first contra o servidor de fixtures local
+
+Executar a partir de src/:
+    python -m extract.bench.httpcache --pages 30 --latency 0.2
+
+Faz um crawl online com o cache vazio, um crawl online de revalidação (304) e
+um crawl em modo replay com o servidor já desligado, usando um diretório de
+cache temporário.
+"""
+import argparse
+import tempfile
+
+from extract.bench.pagination import SPIDERS, crawl
+from extract.bench.server import FixtureServer
+
+
+def bench(spider:str, pages:int, latency:float, concurrency:int):
+    with tempfile.TemporaryDirectory() as cachedir:
+        def run(args, mode):
+            return crawl(spider, args, "fanout", concurrency, {"HTTPCACHE_MODE": mode, "HTTPCACHE_DIR": cachedir})
+
+        print(f"{spider}: {pages} páginas, latência {latency:.2f}s, concorrência {concurrency}")
+        print(f"{'cenário':<22} {'itens':>6} {'tempo (s)':>10} {'rede (200/304)':>15}")
+
+        with FixtureServer(pages=pages, latency=latency) as server:
+            args = SPIDERS[spider][1](server)
+            for name, mode in [("online (cache vazio)", "online"), ("online (revalidação)", "online")]:
+                before = dict(server.hits)
+                result = run(args, mode)
+                hits = f"{server.hits[200] - before.get(200, 0)}/{server.hits[304] - before.get(304, 0)}"
+                print(f"{name:<22} {result['items']:>6} {result['seconds']:>10.2f} {hits:>15}")
+
+        result = run(args, "replay")
+        print(f"{'replay (sem servidor)':<22} {result['items']:>6} {result['seconds']:>10.2f} {'0/0':>15}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--spider", choices=SPIDERS, default="lopes")
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    bench(args.spider, args.pages, args.latency, args.concurrency)
@@ -0,0 +1,117 @@
+"""
+Benchmark da paginação serial x fanout contra o servidor de fixtures local
+
+Executar a partir de src/:
+    python -m extract.bench.pagination --pages 30 --latency 0.2
+
+Cada cenário roda em um processo separado (o reactor do Twisted não pode ser
+reiniciado) e o tempo de crawl é lido do stat elapsed_time_seconds do Scrapy.
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+from extract.bench.server import FixtureServer
+
+# Spider -> (classe, argumentos que apontam o spider para o servidor local)
+SPIDERS = {
+    "lopes": ("extract.spiders.lopes.LopesSpider", lambda server: {"start_urls": [server.url("/lopes/")]}),
+    "chaves": ("extract.spiders.chaves.ChavesSpider", lambda server: {"base_url": server.url("/chaves")}),
+}
+
+
+def run_crawl(spider:str, spider_args:dict, pagination:str, concurrency:int, overrides:dict):
+    """
+    Executa um crawl no processo atual e imprime as estatísticas em JSON
+    """
+    from importlib import import_module
+
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.utils.project import get_project_settings
+
+    module, cls = SPIDERS[spider][0].rsplit(".", 1)
+    spider_cls = getattr(import_module(module), cls)
+
+    settings = get_project_settings()
+    settings.setdict({
+        "CONCURRENT_REQUESTS": concurrency,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": concurrency,
+        "AUTOTHROTTLE_ENABLED": False,
+        "LOG_LEVEL": "ERROR",
+        "FEEDS": {},
+        "ITEM_PIPELINES": {},
+        "HTTPCACHE_MODE": "off",
+        **overrides,
+    }, priority="cmdline")
+
+    process = CrawlerProcess(settings)
+    crawler = process.create_crawler(spider_cls)
+    process.crawl(crawler, allowed_domains=["127.0.0.1"], pagination=pagination, **spider_args)
+    process.start()
+
+    stats = crawler.stats.get_stats()
+    print(json.dumps({
+        "seconds": stats.get("elapsed_time_seconds"),
+        "pages": stats.get("response_received_count", 0),
+        "items": stats.get("item_scraped_count", 0),
+        "dropped": stats.get("fanout/dropped", 0),
+    }))
+
+
+def crawl(spider:str, spider_args:dict, pagination:str="fanout", concurrency:int=1, overrides:dict=None):
+    """
+    Executa run_crawl em um processo separado e retorna as estatísticas
+
+    Parâmetros:
+        spider: str - Chave de SPIDERS
+        spider_args: dict - Argumentos do spider (ex.: URL do servidor local)
+        pagination: str - Modo de paginação
+        concurrency: int - CONCURRENT_REQUESTS e CONCURRENT_REQUESTS_PER_DOMAIN
+        overrides: dict - Settings adicionais do Scrapy
+    """
+    out = subprocess.run(
+        [sys.executable, "-m", "extract.bench.pagination", "--worker",
+         "--spider", spider, "--spider-args", json.dumps(spider_args), "--pagination", pagination,
+         "--concurrency", str(concurrency), "--settings", json.dumps(overrides or {})],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def bench(spider:str, pages:int, latency:float, levels:list):
+    """
+    Compara o tempo de crawl serial com o fanout em vários níveis de concorrência
+    """
+    scenarios = [("serial", 1)] + [("fanout", c) for c in levels]
+
+    with FixtureServer(pages=pages, latency=latency) as server:
+        spider_args = SPIDERS[spider][1](server)
+        print(f"{spider}: {pages} páginas, latência {latency:.2f}s")
+        print(f"{'modo':<8} {'conc.':>5} {'páginas':>8} {'descart.':>8} {'itens':>6} {'tempo (s)':>10} {'speedup':>8}")
+
+        baseline = None
+        for pagination, concurrency in scenarios:
+            result = crawl(spider, spider_args, pagination, concurrency)
+            baseline = baseline or result["seconds"]
+            print(f"{pagination:<8} {concurrency:>5} {result['pages']:>8} {result['dropped']:>8} {result['items']:>6} "
+                  f"{result['seconds']:>10.2f} {baseline / result['seconds']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--spider", choices=SPIDERS, default="lopes")
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--spider-args", type=json.loads, help=argparse.SUPPRESS)
+    parser.add_argument("--pagination", default="fanout", help=argparse.SUPPRESS)
+    parser.add_argument("--concurrency", type=int, default=1, help=argparse.SUPPRESS)
+    parser.add_argument("--settings", type=json.loads, default={}, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_crawl(args.spider, args.spider_args, args.pagination, args.concurrency, args.settings)
+    else:
+        bench(args.spider, args.pages, args.latency, args.levels)
@@ -0,0 +1,146 @@
+"""
+Benchmark offline do parse dos spiders a partir das páginas HTML salvas em fixtures/
+
+Executar a partir de src/:
+    python -m extract.bench.parse                  # compara com baseline.json
+    python -m extract.bench.parse --save-baseline  # grava um novo baseline
+
+Para cada spider reporta páginas/s e cards/s do parse completo (incluindo o
+parse do HTML pelo lxml), o tempo gasto em cada consulta CSS (uma por campo) e
+a memória alocada por página medida com tracemalloc.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from string import Template
+
+import parsel
+from scrapy import Request
+from scrapy.http import HtmlResponse
+from scrapy.utils.test import get_crawler
+
+from extract.bench.server import FIXTURES
+from extract.spiders.chaves import ChavesSpider
+from extract.spiders.lopes import LopesSpider
+
+BASELINE = Path(__file__).parent / "baseline.json"
+
+# Spider -> (classe, fixture, URL da página, meta da requisição)
+CASES = {
+    "lopes": (LopesSpider, "lopes.html", "https://www.lopes.com.br/busca/venda/br/ce/fortaleza", {}),
+    "chaves": (ChavesSpider, "chaves.html", "https://www.chavesnamao.com.br/apartamentos-a-venda/ce-fortaleza/",
+               {'categoria': 'apartamentos'}),
+}
+
+
+class SelectorTimer:
+    """
+    Mede o tempo acumulado de cada consulta CSS feita durante o bloco with
+    """
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+        self._css = parsel.Selector.css
+
+    def __enter__(self):
+        original, seconds, calls = self._css, self.seconds, self.calls
+
+        def css(selector, query):
+            start = time.perf_counter()
+            try:
+                return original(selector, query)
+            finally:
+                seconds[query] += time.perf_counter() - start
+                calls[query] += 1
+
+        parsel.Selector.css = css
+        return self
+
+    def __exit__(self, *exc):
+        parsel.Selector.css = self._css
+
+
+def load_page(fixture:str):
+    return Template((FIXTURES / fixture).read_text(encoding="utf-8")).safe_substitute(
+        next_page="?page=2", last_page=2
+    ).encode("utf-8")
+
+
+def parse_once(spider, body:bytes, url:str, meta:dict):
+    """
+    Faz o parse de uma página nova (sem reaproveitar o seletor já construído) e retorna os itens
+    """
+    response = HtmlResponse(url=url, body=body, encoding="utf-8", request=Request(url, meta=dict(meta)))
+    return [r for r in spider.parse(response) if isinstance(r, dict)]
+
+
+def bench_spider(name:str, iterations:int):
+    spider_cls, fixture, url, meta = CASES[name]
+    spider = spider_cls.from_crawler(get_crawler(spider_cls))
+    body = load_page(fixture)
+
+    cards = len(parse_once(spider, body, url, meta))
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        parse_once(spider, body, url, meta)
+    elapsed = time.perf_counter() - start
+
+    with SelectorTimer() as timer:
+        for _ in range(iterations):
+            parse_once(spider, body, url, meta)
+
+    tracemalloc.start()
+    parse_once(spider, body, url, meta)
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    parse_once(spider, body, url, meta)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "cards_per_page": cards,
+        "pages_per_sec": iterations / elapsed,
+        "cards_per_sec": cards * iterations / elapsed,
+        "peak_kib_per_page": (peak - before) / 1024,
+        "selectors_us_per_page": {q: s / iterations * 1e6 for q, s in sorted(timer.seconds.items(), key=lambda kv: -kv[1])},
+        "selector_calls_per_page": {q: c // iterations for q, c in timer.calls.items()},
+    }
+
+
+def delta(value:float, base:float):
+    return f"{(value - base) / base:+.1%}" if base else ""
+
+
+def report(name:str, result:dict, baseline:dict):
+    base = baseline.get(name, {})
+    print(f"\n== {name} ({result['cards_per_page']} cards/página)")
+    for key, label in [("pages_per_sec", "páginas/s"), ("cards_per_sec", "cards/s"), ("peak_kib_per_page", "pico KiB/página")]:
+        print(f"{label:<18} {result[key]:>12,.1f} {delta(result[key], base.get(key, 0)):>8}")
+
+    print(f"{'consulta CSS':<72} {'chamadas':>8} {'µs/página':>10}")
+    base_selectors = base.get("selectors_us_per_page", {})
+    for query, us in result["selectors_us_per_page"].items():
+        calls = result["selector_calls_per_page"][query]
+        print(f"{query[:72]:<72} {calls:>8} {us:>10,.1f} {delta(us, base_selectors.get(query, 0)):>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--spider", choices=CASES, nargs="+", default=list(CASES))
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    results = {name: bench_spider(name, args.iterations) for name in args.spider}
+
+    for name, result in results.items():
+        report(name, result, {} if args.save_baseline else baseline)
+
+    if args.save_baseline:
+        BASELINE.write_text(json.dumps({**baseline, **results}, indent=2, ensure_ascii=False) + "\n")
+        print(f"\nBaseline salvo em {BASELINE}")
@@ -0,0 +1,109 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from string import Template
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+# Rota -> (fixture, parâmetro de paginação)
+ROUTES = {
+    "/lopes/": ("lopes.html", "page"),
+    "/chaves/": ("chaves.html", "pg"),
+}
+
+
+def make_handler(pages:int, latency:float):
+    """
+    Cria o handler HTTP que serve as fixtures como páginas de resultado numeradas
+
+    As respostas têm ETag e a revalidação com If-None-Match devolve 304. As
+    contagens de respostas por status ficam em server.hits.
+
+    Parâmetros:
+        pages: int - Número de páginas de resultado de cada rota
+        latency: float - Atraso em segundos antes de cada resposta (simula a rede)
+    """
+    templates = {route: Template((FIXTURES / fixture).read_text(encoding="utf-8")) for route, (fixture, _) in ROUTES.items()}
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            route = next((r for r in ROUTES if url.path.startswith(r)), None)
+            if route is None:
+                self.reply_error(404)
+                return
+
+            param = ROUTES[route][1]
+            page = int(parse_qs(url.query).get(param, ["1"])[0])
+            if page > pages:
+                self.reply_error(404)
+                return
+
+            time.sleep(latency)
+            next_page = f"{url.path}?{param}={page + 1}" if page < pages else ""
+            body = templates[route].safe_substitute(next_page=next_page, last_page=pages).encode("utf-8")
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+
+            if self.headers.get("If-None-Match") == etag:
+                self.count(304)
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            self.count(200)
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def count(self, status):
+            with self.server.lock:
+                self.server.hits[status] += 1
+
+        def reply_error(self, status):
+            self.count(status)
+            self.send_error(status)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FixtureHandler
+
+
+class FixtureServer:
+    """
+    Servidor HTTP local com páginas de resultado falsas para benchmarks offline
+
+    Uso:
+        with FixtureServer(pages=20, latency=0.2) as server:
+            server.url("/lopes/")
+    """
+    def __init__(self, pages:int=20, latency:float=0.2):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(pages, latency))
+        self.httpd.daemon_threads = True
+        self.httpd.lock = threading.Lock()
+        self.httpd.hits = Counter()
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def hits(self):
+        return self.httpd.hits
+
+    def url(self, path:str):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}{path}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
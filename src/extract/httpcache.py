@@ -0,0 +1,52 @@
+from scrapy.downloadermiddlewares.httpcache import HttpCacheMiddleware
+from scrapy.exceptions import NotConfigured
+from scrapy.extensions.httpcache import RFC2616Policy
+
+# Modos do cache HTTP (setting HTTPCACHE_MODE, ex.: scrapy crawl lopes -s HTTPCACHE_MODE=replay)
+#   online: toda página em cache é revalidada com If-None-Match/If-Modified-Since;
+#           um 304 reaproveita o corpo salvo, um 200 substitui a entrada do cache
+#   offline: usa a página em cache sempre que existir; só vai à rede para páginas novas
+#   replay: usa somente o cache, requisições sem entrada são descartadas (zero rede)
+#   off: cache desligado
+HTTPCACHE_MODES = ("online", "offline", "replay", "off")
+
+
+def cache_mode(settings):
+    mode = settings.get("HTTPCACHE_MODE", "online")
+    if mode not in HTTPCACHE_MODES:
+        raise ValueError(f"HTTPCACHE_MODE inválido: {mode!r} (use {', '.join(HTTPCACHE_MODES)})")
+    return mode
+
+
+class OfflineFirstPolicy(RFC2616Policy):
+    """
+    Política de cache que ignora os cabeçalhos de expiração dos sites
+
+    Nos modos offline e replay a página em cache é sempre considerada válida;
+    no modo online ela é sempre revalidada com os validadores salvos (ETag e
+    Last-Modified), usando a lógica de 304 do RFC2616Policy.
+    """
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.mode = cache_mode(settings)
+
+    def should_cache_response(self, response, request):
+        return response.status == 200
+
+    def is_cached_response_fresh(self, cachedresponse, request):
+        if self.mode in ("offline", "replay"):
+            return True
+        self._set_conditional_validators(request, cachedresponse)
+        return False
+
+
+class OfflineCacheMiddleware(HttpCacheMiddleware):
+    """
+    HttpCacheMiddleware controlado por HTTPCACHE_MODE (replay implica HTTPCACHE_IGNORE_MISSING)
+    """
+    def __init__(self, settings, stats):
+        mode = cache_mode(settings)
+        if mode == "off":
+            raise NotConfigured
+        super().__init__(settings, stats)
+        self.ignore_missing = self.ignore_missing or mode == "replay"
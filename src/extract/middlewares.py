@@ -0,0 +1,18 @@
+from scrapy.exceptions import IgnoreRequest
+
+
+class FanoutLimitMiddleware:
+    """
+    Descarta antes do download as páginas do fanout além da última página
+
+    O fanout sem a última página informada pelo site agenda janelas de páginas à
+    frente; quando uma resposta revela a última página (ver
+    ListingSpider.fanout()), as páginas seguintes que ainda estão no scheduler
+    não chegam a ser baixadas.
+    """
+    def process_request(self, request, spider):
+        past_last_page = getattr(spider, 'past_last_page', None)
+        if past_last_page is not None and past_last_page(request):
+            spider.crawler.stats.inc_value('fanout/dropped')
+            raise IgnoreRequest(f"Página depois da última: {request.url}")
+        return None
@@ -0,0 +1,117 @@
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+import duckdb
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from extract.seen import fingerprint
+from transform.cleaning import RAW_COLUMNS, ROOT, SPECS, add_metadata, enrich, parse_frame, records_frame
+
+# Junta o arquivo existente e o do crawl incremental, com uma linha por id: a de
+# timestamp_extracao mais recente (no empate, a do crawl novo), na ordem dos arquivos
+MERGE_SQL = """
+    COPY (
+        SELECT * EXCLUDE (filename, file_row_number)
+        FROM read_parquet(['{path}', '{tmp}'], union_by_name = true, filename = true, file_row_number = true)
+        QUALIFY row_number() OVER (
+            PARTITION BY id ORDER BY timestamp_extracao DESC, filename = '{tmp}' DESC
+        ) = 1
+        ORDER BY filename = '{tmp}', file_row_number
+    ) TO '{merged}' (FORMAT parquet, COMPRESSION zstd)
+"""
+
+
+class InterimParquetPipeline:
+    """
+    Limpa os itens à medida que chegam e grava data/interim/<fonte>.parquet
+
+    Os itens de cada fonte são acumulados em lotes de INTERIM_BATCH_SIZE; cada lote
+    passa pelas mesmas regras de transform.cleaning (parse_frame, add_metadata e
+    enrich) e vira um row group do Parquet, então a memória fica limitada pelo
+    tamanho do lote. A remoção de nulos e duplicados é feita item a item, guardando
+    só um fingerprint de 64 bits (extract.seen.fingerprint) de cada item já visto.
+
+    O arquivo é escrito em <fonte>.parquet.tmp e só substitui o anterior no fim do
+    crawl. Em crawls incrementais (-a incremental=1) as linhas novas são
+    acrescentadas ao arquivo existente (MERGE_SQL); um anúncio reemitido (ex.: com
+    preço novo) substitui a linha anterior com o mesmo id.
+    """
+    def __init__(self, batch_size:int, interim_dir:Path):
+        self.batch_size = batch_size
+        self.interim_dir = Path(interim_dir)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        return cls(
+            batch_size=settings.getint('INTERIM_BATCH_SIZE', 500),
+            interim_dir=settings.get('INTERIM_DIR') or ROOT / "data" / "interim",
+        )
+
+    def open_spider(self, spider):
+        self.timestamp = datetime.now()
+        self.con = duckdb.connect()
+        self.buffers = defaultdict(list)
+        self.seen = defaultdict(set)
+        self.offsets = defaultdict(dict)
+        self.writers = {}
+
+    def process_item(self, item, spider):
+        fonte = spider.fonte(item)
+        row = tuple(item.get(col) for col in RAW_COLUMNS)
+
+        if SPECS[fonte]['dropna_dedup']:
+            if row[0] is None:
+                return item
+            fp = fingerprint(dict(zip(RAW_COLUMNS, row)))
+            if fp in self.seen[fonte]:
+                return item
+            self.seen[fonte].add(fp)
+
+        self.buffers[fonte].append(row)
+        if len(self.buffers[fonte]) >= self.batch_size:
+            self.flush(fonte, spider)
+        return item
+
+    def flush(self, fonte:str, spider):
+        rows, self.buffers[fonte] = self.buffers[fonte], []
+        if not rows:
+            return
+
+        spec = {**SPECS[fonte], 'dropna_dedup': False}
+        df = records_frame(rows, spec)
+        df = enrich(add_metadata(parse_frame(df, spec), spec, self.timestamp, self.offsets[fonte]), self.con)
+        if df.empty:
+            return
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if fonte not in self.writers:
+            self.writers[fonte] = pq.ParquetWriter(self.tmp_path(fonte), table.schema, compression='zstd')
+        writer = self.writers[fonte]
+        writer.write_table(table.cast(writer.schema))
+        spider.crawler.stats.inc_value(f'interim/{fonte}/rows', len(df))
+
+    def close_spider(self, spider):
+        for fonte in list(self.buffers):
+            self.flush(fonte, spider)
+
+        for fonte, writer in self.writers.items():
+            writer.close()
+            path, tmp = self.path(fonte), self.tmp_path(fonte)
+            if spider.incremental and path.exists():
+                merged = path.with_suffix('.merge.tmp')
+                self.con.execute(MERGE_SQL.format(path=path, tmp=tmp, merged=merged))
+                tmp.unlink()
+                tmp = merged
+            tmp.replace(path)
+            spider.logger.info("Dados limpos salvos em %s", path)
+
+        self.con.close()
+
+    def path(self, fonte:str):
+        return self.interim_dir / f"{fonte}.parquet"
+
+    def tmp_path(self, fonte:str):
+        return self.interim_dir / f"{fonte}.parquet.tmp"
@@ -0,0 +1,64 @@
+import hashlib
+import json
+from array import array
+from pathlib import Path
+
+STATE_DIR = Path(__file__).resolve().parents[2] / "data" / "state"
+
+
+def fingerprint(item:dict):
+    """
+    Fingerprint de 64 bits de um anúncio a partir de todos os campos extraídos
+
+    Qualquer mudança nos campos (inclusive no preço) gera um fingerprint novo,
+    então anúncios reprecificados são tratados como novos.
+    """
+    payload = json.dumps(dict(item), sort_keys=True, ensure_ascii=False, default=str)
+    return int.from_bytes(hashlib.blake2b(payload.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class SeenListings:
+    """
+    Conjunto persistente de fingerprints de anúncios já vistos
+
+    Gravado em disco como um array binário de inteiros de 64 bits (8 bytes por
+    anúncio), carregado inteiro em memória como set.
+
+    Parâmetros:
+        path: Path - Arquivo do conjunto (criado no primeiro save())
+    """
+    def __init__(self, path:Path):
+        self.path = Path(path)
+        self.fingerprints = set()
+        if self.path.exists():
+            data = array("Q")
+            data.frombytes(self.path.read_bytes())
+            self.fingerprints.update(data)
+        self.added = 0
+
+    @classmethod
+    def for_spider(cls, name:str):
+        return cls(STATE_DIR / f"{name}.seen")
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def __contains__(self, item:dict):
+        return fingerprint(item) in self.fingerprints
+
+    def add(self, item:dict):
+        """
+        Adiciona o anúncio e retorna True se ele ainda não tinha sido visto
+        """
+        fp = fingerprint(item)
+        if fp in self.fingerprints:
+            return False
+        self.fingerprints.add(fp)
+        self.added += 1
+        return True
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_bytes(array("Q", sorted(self.fingerprints)).tobytes())
+        tmp.replace(self.path)
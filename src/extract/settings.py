@@ -20,14 +20,17 @@ USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64; rv:137.0) Gecko/20100101 Firefox/1
 ROBOTSTXT_OBEY = False
 
 # Configure maximum concurrent requests performed by Scrapy (default: 16)
-#CONCURRENT_REQUESTS = 32
+# Com -a pagination=fanout todas as páginas de resultado são agendadas de uma
+# vez; o paralelismo efetivo por site é CONCURRENT_REQUESTS_PER_DOMAIN, ajustado
+# dinamicamente pelo AutoThrottle abaixo.
+CONCURRENT_REQUESTS = 16
 
 # Configure a delay for requests for the same website (default: 0)
 # See https://docs.scrapy.org/en/latest/topics/settings.html#download-delay
 # See also autothrottle settings and docs
 #DOWNLOAD_DELAY = 3
 # The download delay setting will honor only one of:
-#CONCURRENT_REQUESTS_PER_DOMAIN = 16
+CONCURRENT_REQUESTS_PER_DOMAIN = 8
 #CONCURRENT_REQUESTS_PER_IP = 16
 
 # Disable cookies (enabled by default)
@@ -50,9 +53,11 @@ ROBOTSTXT_OBEY = False
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-#DOWNLOADER_MIDDLEWARES = {
-#    "extract.middlewares.extractDownloaderMiddleware": 543,
-#}
+DOWNLOADER_MIDDLEWARES = {
+    "extract.middlewares.FanoutLimitMiddleware": 50,
+    "scrapy.downloadermiddlewares.httpcache.HttpCacheMiddleware": None,
+    "extract.httpcache.OfflineCacheMiddleware": 900,
+}
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
@@ -62,30 +67,40 @@ ROBOTSTXT_OBEY = False
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
-#ITEM_PIPELINES = {
-#    "extract.pipelines.extractPipeline": 300,
-#}
+# Os itens são limpos em lotes de INTERIM_BATCH_SIZE e gravados em
+# data/interim/<fonte>.parquet; RAW_JSON = True grava também o JSON bruto em data/raw/
+ITEM_PIPELINES = {
+    "extract.pipelines.InterimParquetPipeline": 300,
+}
+INTERIM_BATCH_SIZE = 500
+RAW_JSON = False
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
-#AUTOTHROTTLE_ENABLED = True
+AUTOTHROTTLE_ENABLED = True
 # The initial download delay
-#AUTOTHROTTLE_START_DELAY = 5
+AUTOTHROTTLE_START_DELAY = 0.5
 # The maximum download delay to be set in case of high latencies
-#AUTOTHROTTLE_MAX_DELAY = 60
+AUTOTHROTTLE_MAX_DELAY = 10
 # The average number of requests Scrapy should be sending in parallel to
 # each remote server
-#AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
+AUTOTHROTTLE_TARGET_CONCURRENCY = 4.0
 # Enable showing throttling stats for every response received:
 #AUTOTHROTTLE_DEBUG = False
 
 # Enable and configure HTTP caching (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-middleware-settings
-#HTTPCACHE_ENABLED = True
-#HTTPCACHE_EXPIRATION_SECS = 0
-#HTTPCACHE_DIR = "httpcache"
-#HTTPCACHE_IGNORE_HTTP_CODES = []
-#HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
+# Cache offline-first: respostas gravadas com gzip por fingerprint da URL em
+# src/.scrapy/httpcache. HTTPCACHE_MODE escolhe o comportamento (ver extract/httpcache.py):
+#   online (revalida com ETag/Last-Modified), offline (cache primeiro),
+#   replay (somente cache, nenhuma requisição à rede) ou off.
+HTTPCACHE_ENABLED = True
+HTTPCACHE_MODE = "online"
+HTTPCACHE_EXPIRATION_SECS = 0
+HTTPCACHE_DIR = "httpcache"
+HTTPCACHE_GZIP = True
+HTTPCACHE_POLICY = "extract.httpcache.OfflineFirstPolicy"
+HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
 
 # Set settings whose default value is deprecated to a future-proof value
 TWISTED_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
@@ -0,0 +1,209 @@
+import re
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import scrapy
+
+from extract.seen import SeenListings
+
+RAW_DIR = Path(__file__).resolve().parents[3] / "data" / "raw"
+
+
+def page_url_template(next_url:str, next_number:int):
+    """
+    Descobre o padrão de URL das páginas de resultado a partir do link de próxima página
+
+    Procura o número da próxima página primeiro nos parâmetros da query string
+    (ex.: ?page=2, ?pg=2) e depois no caminho da URL (ex.: /pagina/2/). Retorna
+    uma função que monta a URL da página N, ou None se o padrão não for encontrado.
+
+    Parâmetros:
+        next_url: str - URL absoluta da próxima página
+        next_number: int - Número da página que next_url representa
+    """
+    parts = urlsplit(next_url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+
+    for i, (key, value) in enumerate(query):
+        if value == str(next_number):
+            def build(n, i=i, key=key):
+                params = list(query)
+                params[i] = (key, str(n))
+                return urlunsplit(parts._replace(query=urlencode(params)))
+            return build
+
+    matches = list(re.finditer(rf'(?<!\d){next_number}(?!\d)', parts.path))
+    if matches:
+        start, end = matches[-1].span()
+        def build(n):
+            path = f"{parts.path[:start]}{n}{parts.path[end:]}"
+            return urlunsplit(parts._replace(path=path))
+        return build
+
+    return None
+
+
+class ListingSpider(scrapy.Spider):
+    """
+    Base dos spiders de listagem de imóveis
+
+    As subclasses implementam parse_listings() (extração dos cards de uma página)
+    e definem o seletor do link de próxima página. A paginação é escolhida com
+    -a pagination=...:
+        serial: segue o link de próxima página depois de processar cada página
+        fanout: descobre o padrão de URL na primeira resposta e agenda as páginas
+                sem esperar o parse das anteriores, deixando o downloader baixá-las
+                em paralelo (limitado por CONCURRENT_REQUESTS_PER_DOMAIN e pelo AutoThrottle)
+
+    Com -a incremental=1 os fingerprints dos anúncios ficam em data/state/<spider>.seen:
+    só anúncios novos ou reprecificados são emitidos e a paginação para depois de
+    uma página composta apenas por anúncios já vistos.
+
+    Os itens são limpos e gravados em data/interim/ pelo InterimParquetPipeline.
+    Com -s RAW_JSON=True os itens brutos também são gravados em data/raw/ (ver
+    raw_feeds()), para depuração dos seletores.
+    """
+    max_page = 99
+    pagination = "serial"
+    next_page_css = None
+    last_page_css = None
+    carry_meta = ()
+    incremental = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_page = int(self.max_page)
+        if self.pagination not in ("serial", "fanout"):
+            raise ValueError(f"Modo de paginação inválido: {self.pagination!r}")
+        self._fanout = {}
+        self.incremental = str(self.incremental).lower() in ("1", "true", "sim")
+        self.seen = SeenListings.for_spider(self.name) if self.incremental else None
+
+    @classmethod
+    def update_settings(cls, settings):
+        super().update_settings(settings)
+        if settings.getbool('RAW_JSON'):
+            settings.set('FEEDS', cls.raw_feeds(), priority='spider')
+
+    @classmethod
+    def raw_feeds(cls):
+        """
+        FEEDS dos arquivos brutos em data/raw/ (usado com -s RAW_JSON=True)
+        """
+        return {(RAW_DIR / f"{cls.name}.json").as_uri(): {'format': 'json', 'overwrite': True}}
+
+    def fonte(self, item):
+        """
+        Fonte de dados do item (chave de transform.cleaning.SPECS)
+        """
+        return self.name
+
+    def parse(self, response):
+        listings = list(self.parse_listings(response))
+        if not self.incremental:
+            yield from listings
+            yield from self.paginate(response, items=len(listings))
+            return
+
+        new = [item for item in listings if self.seen.add(item)]
+        self.crawler.stats.inc_value('incremental/new', len(new))
+        self.crawler.stats.inc_value('incremental/known', len(listings) - len(new))
+        yield from new
+
+        exhausted = bool(listings) and not new
+        if exhausted:
+            self.logger.info("Página %s só tem anúncios já vistos, parando a paginação", response.url)
+        yield from self.paginate(response, exhausted=exhausted, items=len(listings))
+
+    def closed(self, reason):
+        if self.seen is not None:
+            self.seen.save()
+            self.logger.info("%d anúncios novos, %d no conjunto de vistos", self.seen.added, len(self.seen))
+
+    def parse_listings(self, response):
+        raise NotImplementedError
+
+    def page_limit(self, response):
+        """
+        Última página a ser visitada a partir da resposta atual
+        """
+        return self.max_page
+
+    def last_page(self, response):
+        """
+        Número da última página segundo a paginação do site, limitado por page_limit()
+
+        Retorna None se o spider não define last_page_css ou o seletor não encontra
+        nada. No modo incremental também retorna None, para que o fanout avance em
+        janelas e possa parar na primeira página sem anúncios novos.
+        """
+        if not self.last_page_css or self.incremental:
+            return None
+        numbers = [int(n) for n in response.css(self.last_page_css).re(r'\d+')]
+        return min(max(numbers), self.page_limit(response)) if numbers else None
+
+    def page_meta(self, response, page:int):
+        """
+        Meta da requisição da página seguinte (número da página e chaves de carry_meta)
+        """
+        meta = {key: response.meta[key] for key in self.carry_meta if key in response.meta}
+        meta['page'] = page
+        return meta
+
+    def paginate(self, response, exhausted:bool=False, items:int=None):
+        page = response.meta.get('page', 1)
+        if page >= self.page_limit(response):
+            return
+
+        next_page = None if exhausted else response.css(self.next_page_css).get()
+        if self.pagination == "fanout":
+            yield from self.fanout(response, page, next_page, items)
+        elif next_page:
+            next_page_url = response.urljoin(next_page)
+            yield scrapy.Request(url=next_page_url, callback=self.parse, meta=self.page_meta(response, page + 1))
+
+    def fanout(self, response, page:int, next_page:str, items:int=None):
+        """
+        Agenda as próximas páginas sem esperar o parse das anteriores
+
+        Se o site informa a última página, todas são agendadas a partir da primeira
+        resposta. Caso contrário mantém uma janela de CONCURRENT_REQUESTS_PER_DOMAIN
+        páginas à frente da maior página já recebida, até a primeira página sem link
+        de próxima página ou com menos anúncios que a primeira (o tamanho da página
+        do site). A partir daí nenhuma janela nova é aberta, e as páginas agendadas
+        depois da última ainda não baixadas são descartadas (past_last_page(), usado
+        por extract.middlewares.FanoutLimitMiddleware).
+        """
+        key = tuple(response.meta.get(k) for k in self.carry_meta)
+        state = self._fanout.get(key)
+
+        if state is None:
+            if not next_page:
+                return
+            next_page_url = response.urljoin(next_page)
+            build = page_url_template(next_page_url, page + 1)
+            if build is None:
+                self.logger.warning("Padrão de URL não encontrado em %s, usando paginação serial", next_page_url)
+                yield scrapy.Request(url=next_page_url, callback=self.parse, meta=self.page_meta(response, page + 1))
+                return
+            state = self._fanout[key] = {'build': build, 'last': self.last_page(response), 'scheduled': page,
+                                         'page_size': items}
+
+        if not next_page or (items is not None and state['page_size'] and items < state['page_size']):
+            state['last'] = min(state['last'] or page, page)
+        if state['last']:
+            target = state['last']
+        else:
+            window = self.settings.getint("CONCURRENT_REQUESTS_PER_DOMAIN")
+            target = min(page + window, self.page_limit(response))
+
+        for n in range(state['scheduled'] + 1, target + 1):
+            yield scrapy.Request(url=state['build'](n), callback=self.parse, meta=self.page_meta(response, n))
+        state['scheduled'] = max(state['scheduled'], target)
+
+    def past_last_page(self, request):
+        """
+        Se a requisição é de uma página do fanout depois da última página já conhecida
+        """
+        state = self._fanout.get(tuple(request.meta.get(k) for k in self.carry_meta))
+        return bool(state and state['last'] and request.meta.get('page', 1) > state['last'])
@@ -1,35 +1,123 @@
 import scrapy
 
+from extract.spiders.base import RAW_DIR, ListingSpider
 
-class ChavesAptoSpider(scrapy.Spider):
+# Categorias de imóveis do Chaves na Mão: slug -> caminho da busca, tipo, arquivo bruto
+# e fonte de dados da limpeza (transform.cleaning.SPECS)
+CATEGORIAS = {
+    'apartamentos': {
+        'path': "/apartamentos-a-venda/ce-fortaleza/",
+        'tipo': 'Apartamento',
+        'feed': RAW_DIR / "chaves.json",
+        'fonte': 'chaves_apts',
+    },
+    'casas': {
+        'path': "/casas-a-venda/ce-fortaleza/",
+        'tipo': 'Casa',
+        'feed': RAW_DIR / "chaves_casas.json",
+        'fonte': 'chaves_casas',
+    },
+    'condominios': {
+        'path': "/casas-em-condominio-a-venda/ce-fortaleza/",
+        'tipo': 'Condomínio',
+        'feed': RAW_DIR / "chaves_condominio.json",
+        'fonte': 'chaves_condominio',
+    },
+}
+
+
+class CategoriaFilter:
+    """
+    Filtro de itens do FEEDS que aceita apenas os itens de uma categoria
+    """
+    def __init__(self, feed_options):
+        self.categoria = feed_options['categoria']
+
+    def accepts(self, item):
+        return item.get('categoria') == self.categoria
+
+
+class ChavesSpider(ListingSpider):
+    """
+    Spider único do Chaves na Mão para todas as categorias de imóveis
+
+    As categorias compartilham o mesmo processo, scheduler e pool de conexões.
+    Cada item recebe a sua categoria e é limpo de acordo com a fonte da categoria;
+    com -s RAW_JSON=True também é gravado no arquivo bruto correspondente em data/raw/.
+
+    Argumentos (-a):
+        categorias: slugs separados por vírgula (padrão: todas as de CATEGORIAS)
+        max_page: limite de páginas aplicado a todas as categorias
+        max_page_<categoria>: limite de páginas de uma categoria específica
+        base_url: endereço do site (usado pelos benchmarks com o servidor local)
+    """
     name = "chaves"
     allowed_domains = ["www.chavesnamao.com.br"]
-    start_urls = ["https://www.chavesnamao.com.br/apartamentos-a-venda/ce-fortaleza/"]
-    page_count = 1
+    base_url = "https://www.chavesnamao.com.br"
     max_page = 99
+    next_page_css = 'span.row.w100.style-module__yjYI8a__nextlink a::attr(href)'
+    carry_meta = ('categoria',)
+
+    def __init__(self, categorias=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if isinstance(categorias, str):
+            categorias = [c.strip() for c in categorias.split(',') if c.strip()]
+        self.categorias = list(categorias or CATEGORIAS)
+
+        desconhecidas = set(self.categorias) - set(CATEGORIAS)
+        if desconhecidas:
+            raise ValueError(f"Categorias desconhecidas: {', '.join(sorted(desconhecidas))}")
+
+        self.page_limits = {c: int(getattr(self, f'max_page_{c}', self.max_page)) for c in self.categorias}
+
+    def start_requests(self):
+        for categoria in self.categorias:
+            yield scrapy.Request(
+                url=self.base_url.rstrip('/') + CATEGORIAS[categoria]['path'],
+                callback=self.parse,
+                meta={'categoria': categoria, 'page': 1},
+            )
+
+    @classmethod
+    def raw_feeds(cls):
+        return {
+            info['feed'].as_uri(): {
+                'format': 'json',
+                'overwrite': True,
+                'store_empty': False,
+                'item_filter': CategoriaFilter,
+                'categoria': categoria,
+            }
+            for categoria, info in CATEGORIAS.items()
+        }
+
+    def fonte(self, item):
+        return CATEGORIAS[item['categoria']]['fonte']
+
+    def page_limit(self, response):
+        return self.page_limits[response.meta['categoria']]
+
+    def parse_listings(self, response):
+        categoria = response.meta['categoria']
+        tipo = CATEGORIAS[categoria]['tipo']
+        stats = self.crawler.stats
+        stats.inc_value(f'chaves/{categoria}/pages')
 
-    def parse(self, response):
         imoveis = response.css('span.card-module__cvK-Xa__cardContent')
         
         for imovel in imoveis:
             raw_area = imovel.css('p.styles-module__aBT18q__body2.undefined::text').getall()
             condos = imovel.css('span.card-module__cvK-Xa__cardContent p small::text').getall()
 
+            stats.inc_value(f'chaves/{categoria}/items')
             yield {
                 'preco' : imovel.css('span.card-module__cvK-Xa__cardContent p b::text').get(),
-                'tipo' : 'Apartamento',
+                'tipo' : tipo,
                 'localizacao' : imovel.css('address p:nth-of-type(2)::text').get(),
                 'area' : raw_area[1] if raw_area else None,
                 'quartos' : imovel.css('span.style-module__Yo5w-q__list p:nth-of-type(2)::text').get(),
                 'banheiros' : imovel.css('span.style-module__Yo5w-q__list p:nth-of-type(4)::text').get(),
                 'vagas' : imovel.css('span.style-module__Yo5w-q__list p:nth-of-type(3)::text').get(),
                 'condo' : condos[1] if condos else None,
-
+                'categoria' : categoria,
             }
-
-        if self.page_count < self.max_page:
-            next_page = response.css('span.row.w100.style-module__yjYI8a__nextlink a::attr(href)').get()
-            if next_page:
-                self.page_count += 1
-                next_page_url = response.urljoin(next_page)
-                yield scrapy.Request(url=next_page_url, callback=self.parse)
\ No newline at end of file
@@ -1,14 +1,15 @@
-import scrapy
+from extract.spiders.base import ListingSpider
 
 
-class LopesSpider(scrapy.Spider):
+class LopesSpider(ListingSpider):
     name = "lopes"
     allowed_domains = ["www.lopes.com.br"]
     start_urls = ["https://www.lopes.com.br/busca/venda/br/ce/fortaleza"]
-    page_count = 1
     max_page = 99
+    next_page_css = 'li.page-item.page-item-next.ng-star-inserted a::attr(href)'
+    last_page_css = 'li.page-item.ng-star-inserted a::text'
 
-    def parse(self, response):
+    def parse_listings(self, response):
         imoveis = response.css('div.card.ng-star-inserted')
         
         for imovel in imoveis:
@@ -23,10 +24,3 @@ class LopesSpider(scrapy.Spider):
                 'vagas' : imovel.css('ul li:nth-child(4) p::text').get(),
                 'condo' : imovel.css('ul.subprices.ng-star-inserted li span::text').get()
             }
-
-        if self.page_count < self.max_page:
-            next_page = response.css('li.page-item.page-item-next.ng-star-inserted a::attr(href)').get()
-            if next_page:
-                self.page_count += 1
-                next_page_url = response.urljoin(next_page)
-                yield scrapy.Request(url=next_page_url, callback=self.parse)
\ No newline at end of file
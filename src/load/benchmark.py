@@ -0,0 +1,97 @@
+"""
+Benchmark da carga no SQLite: to_sql (carga anterior) x data_ingestion.load()
+
+Executar a partir da raiz do repositório:
+    python src/load/benchmark.py --scale 20
+
+Os anúncios de data/interim são repetidos --scale vezes (com ids distintos) e
+carregados em bancos temporários pelos dois caminhos. Depois são medidas as
+consultas típicas do notebook e do dashboard em cada banco.
+"""
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from load.data_ingestion import load, read_interim
+
+QUERIES = {
+    "SELECT * (notebook)": "SELECT * FROM raw_imoveis",
+    "ser = 'SER2'": "SELECT COUNT(*), AVG(preco) FROM raw_imoveis WHERE ser = 'SER2'",
+    "localizacao = 'Aldeota'": "SELECT * FROM raw_imoveis WHERE localizacao = 'Aldeota'",
+    "tipo = 'Casa'": "SELECT COUNT(*) FROM raw_imoveis WHERE tipo = 'Casa'",
+    "preco entre 300 e 400 mil": "SELECT COUNT(*) FROM raw_imoveis WHERE preco BETWEEN 300000 AND 400000",
+    "top 10 preços": "SELECT id, preco FROM raw_imoveis ORDER BY preco DESC LIMIT 10",
+}
+
+
+def scaled(df:pd.DataFrame, scale:int):
+    copies = [df.assign(id=df['id'].astype(str) + f"-{i}") for i in range(scale)]
+    return pd.concat(copies, ignore_index=True)
+
+
+def load_legacy(df:pd.DataFrame, database:Path):
+    """
+    Carga anterior: to_sql com method='multi', sem chave nem índices
+
+    O chunksize não existia na carga anterior, mas sem ele o INSERT de várias
+    linhas passa do limite de 32766 parâmetros do SQLite.
+    """
+    conn = sqlite3.connect(database)
+    df.to_sql("raw_imoveis", conn, if_exists='replace', index=False, method='multi', chunksize=32766 // len(df.columns))
+    conn.close()
+
+
+def time_queries(database:Path, repeat:int):
+    conn = sqlite3.connect(database)
+    timings = {}
+    for label, sql in QUERIES.items():
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.execute(sql).fetchall()
+            runs.append(time.perf_counter() - start)
+        timings[label] = min(runs)
+    conn.close()
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    df = scaled(read_interim(), args.scale)
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy, new = Path(tmp) / "legacy.db", Path(tmp) / "new.db"
+
+        start = time.perf_counter()
+        load_legacy(df, legacy)
+        legacy_load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        load(df, new)
+        new_load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        load(df, new)
+        upsert = time.perf_counter() - start
+
+        before, after = time_queries(legacy, args.repeat), time_queries(new, args.repeat)
+
+    print(f"{len(df):,} anúncios\n")
+    print(f"{'carga':<32} {'segundos':>10}")
+    print(f"{'to_sql (anterior)':<32} {legacy_load:>10.2f}")
+    print(f"{'executemany + WAL':<32} {new_load:>10.2f}")
+    print(f"{'executemany, só upserts':<32} {upsert:>10.2f}")
+
+    print(f"\n{'consulta':<32} {'antes (ms)':>10} {'depois (ms)':>11}")
+    for label in QUERIES:
+        print(f"{label:<32} {before[label] * 1000:>10.2f} {after[label] * 1000:>11.2f}")
@@ -1,16 +1,206 @@
-import pandas as pd
+"""
+Carga dos dados de data/interim na tabela raw_imoveis de data/imv_database.db
+
+Executar a partir da raiz do repositório:
+    python src/load/data_ingestion.py
+
+Os anúncios são inseridos em lotes com executemany, dentro de uma única
+transação, e atualizados pelo id (upsert): anúncios de cargas anteriores que não
+vieram nesta carga continuam na tabela. Durante a carga o banco usa WAL e
+synchronous=OFF; no fim, synchronous volta a NORMAL e os índices de
+localizacao, ser, tipo e preco são criados (se ainda não existirem).
+
+Os ids precisam estar no formato de cleaning.gerar_ids: .csv com ids UUID4
+(limpos antes dos ids determinísticos) são rejeitados, e uma tabela que tenha
+ids nesse formato é recriada.
+
+Lê os .csv de data/interim/ na ordem de SPECS, como a carga original: o rowid
+dos anúncios novos segue a ordem das fontes e das linhas em cada fonte, e
+processed.py usa essa ordem para manter a primeira ocorrência de cada anúncio
+repetido. O dataset Parquet interim (transform.storage) é particionado por
+origem/ser e não guarda essa ordem.
+"""
+import argparse
 import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from transform.cleaning import SPECS
+from transform.schema import read_csv
+from transform.storage import dataset_exists, read_dataset
+
+ROOT = Path(__file__).resolve().parents[2]
+DATABASE = ROOT / "data" / "imv_database.db"
+
+COLUMNS = {
+    'id': 'TEXT PRIMARY KEY',
+    'origem': 'TEXT',
+    'tipo': 'TEXT',
+    'localizacao': 'TEXT',
+    'ser': 'TEXT',
+    'prox_centro': 'INTEGER',
+    'prox_orla': 'INTEGER',
+    'area': 'INTEGER',
+    'quartos': 'INTEGER',
+    'banheiros': 'INTEGER',
+    'vagas': 'INTEGER',
+    'condo': 'REAL',
+    'preco': 'REAL',
+    'timestamp_extracao': 'TEXT',
+}
+
+INDEXES = ['localizacao', 'ser', 'tipo', 'preco']
+
+FLAGS = ['prox_centro', 'prox_orla']
+
+# Formato dos ids de cleaning.gerar_ids (64 bits em hexadecimal)
+ID_PATTERN = '[0-9a-f]{16}'
+LEGACY_ID_SQL = "SELECT 1 FROM raw_imoveis WHERE length(id) != 16 OR id GLOB '*[^0-9a-f]*' LIMIT 1"
+
+UPSERT_SQL = f"""
+    INSERT INTO raw_imoveis ({', '.join(COLUMNS)})
+    VALUES ({', '.join('?' * len(COLUMNS))})
+    ON CONFLICT (id) DO UPDATE SET {', '.join(f'{col} = excluded.{col}' for col in COLUMNS if col != 'id')}
+"""
+
+
+def read_interim(source_order:bool=False):
+    """
+    Anúncios de todas as fontes, com os tipos de transform.schema
+
+    Parâmetros:
+        source_order: bool - Lê os .csv, na ordem de SPECS e das linhas de cada fonte,
+            mesmo quando o dataset Parquet (mais rápido, mas agrupado por partição) existe
+    """
+    if not source_order and dataset_exists("interim"):
+        return read_dataset("interim")
+    return pd.concat([read_csv(ROOT / spec['interim']) for spec in SPECS.values()], ignore_index=True)
+
+
+def flag_sql(col:str):
+    """
+    Expressão SQL da flag como 1/0, aceitando também o 'Sim'/'Não' das tabelas da carga anterior
+    """
+    return f"CASE {col} WHEN 'Sim' THEN 1 WHEN 'Não' THEN 0 ELSE CAST({col} AS INTEGER) END"
+
+
+def create_table(conn:sqlite3.Connection):
+    """
+    Cria raw_imoveis com id como chave primária
+
+    Uma tabela criada pela versão anterior da carga (to_sql, sem chave e com as
+    flags como 'Sim'/'Não'), ou com algum id fora do formato de cleaning.gerar_ids
+    (UUID4 de .csv limpos antes dos ids determinísticos), é substituída sem as
+    linhas: esses ids não correspondem aos da carga que vem em seguida, então as
+    linhas antigas nunca seriam atualizadas e cada anúncio ficaria duplicado. A
+    carga regrava todos os anúncios de data/interim.
+    """
+    ddl = f"CREATE TABLE raw_imoveis ({', '.join(f'{col} {kind}' for col, kind in COLUMNS.items())})"
+    info = conn.execute("PRAGMA table_info(raw_imoveis)").fetchall()
+    if (info and any(name == 'id' and pk for _, name, _, _, _, pk in info)
+            and conn.execute(LEGACY_ID_SQL).fetchone() is None):
+        return
+    if info:
+        conn.execute("DROP TABLE raw_imoveis")
+    conn.execute(ddl)
+
+
+def check_ids(df:pd.DataFrame):
+    """
+    Rejeita anúncios com id fora do formato de cleaning.gerar_ids
+
+    Um .csv de data/interim limpo antes dos ids determinísticos tem ids UUID4, que
+    mudam a cada limpeza: gravados com upsert, duplicariam os anúncios na tabela.
+    """
+    legacy = ~df['id'].astype(str).str.fullmatch(ID_PATTERN)
+    if legacy.any():
+        raise ValueError(f"{legacy.sum()} anúncios com id fora do formato de cleaning.gerar_ids "
+                         f"(ex.: {df.loc[legacy, 'id'].iloc[0]}); refaça a limpeza com src/transform/cleaning.py")
+
+
+def create_indexes(conn:sqlite3.Connection):
+    for col in INDEXES:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS ix_raw_imoveis_{col} ON raw_imoveis ({col})")
+
+
+def rows(df:pd.DataFrame):
+    """
+    Linhas de df como tuplas de tipos nativos do Python, na ordem de COLUMNS
+
+    As linhas saem na ordem de df, que define o rowid dos anúncios novos.
+    """
+    columns = []
+    for col in COLUMNS:
+        values = df[col]
+        if col in FLAGS:
+            values = values.astype('int8')
+        elif col == 'timestamp_extracao':
+            stamps = np.datetime_as_string(values.to_numpy(dtype='datetime64[us]'), unit='us')
+            columns.append([stamp.replace('T', ' ') for stamp in stamps])
+            continue
+        columns.append(values.tolist())
+    return zip(*columns)
+
+
+def load(df:pd.DataFrame, database:Path=DATABASE, batch_size:int=10_000):
+    """
+    Grava os anúncios em raw_imoveis (upsert pelo id) e cria os índices
+
+    Parâmetros:
+        df: pd.DataFrame - Anúncios com as colunas de COLUMNS
+        database: Path - Arquivo do banco SQLite
+        batch_size: int - Linhas por chamada de executemany
+    """
+    check_ids(df)
+    conn = sqlite3.connect(database, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("BEGIN")
+        create_table(conn)
+        batch = []
+        for row in rows(df):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                conn.executemany(UPSERT_SQL, batch)
+                batch = []
+        if batch:
+            conn.executemany(UPSERT_SQL, batch)
+        create_indexes(conn)
+        conn.execute("COMMIT")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA optimize")
+        return conn.execute("SELECT COUNT(*) FROM raw_imoveis").fetchone()[0]
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
 
-conn = sqlite3.connect("data/imv_database.db")
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", type=Path, default=DATABASE, help="Banco SQLite (padrão: data/imv_database.db)")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args(argv)
 
-lopes = pd.read_csv("data/processed/lopes.csv")
-lopes.to_sql("raw_imoveis", conn, if_exists='replace', index=False, method='multi')
+    start = time.perf_counter()
+    df = read_interim(source_order=True)
+    read = time.perf_counter() - start
+    total = load(df, args.database, args.batch_size)
+    print(f"{len(df)} anúncios lidos em {read:.2f}s e gravados em {time.perf_counter() - start - read:.2f}s; "
+          f"raw_imoveis tem {total} linhas")
+    print("\nCriação do banco de dados sqlite3 e ingestão de dados completa.")
+    return 0
 
-chaves_1 = pd.read_csv("data/processed/chaves_apts.csv")
-chaves_2 = pd.read_csv("data/processed/chaves_casas.csv")
-chaves_3 = pd.read_csv("data/processed/chaves_condominio.csv")
-chaves = pd.concat([chaves_1, chaves_2, chaves_3])
-chaves.to_sql("raw_imoveis", conn, if_exists='append', index=False, method='multi')
 
-print("\nCriação do banco de dados sqlite3 e ingestão de dados completa.")
-conn.close()
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""
+Warehouse DuckDB com fotografias de cada crawl e agregados (data/warehouse.duckdb)
+
+Executar a partir da raiz do repositório:
+    python src/load/warehouse.py                          # grava a fotografia dos dados de data/interim
+    python src/load/warehouse.py --crawl-date 2025-04-23  # data da fotografia (padrão: data da extração)
+    python src/load/warehouse.py --report                 # consultas de exemplo, agregados x fotografias
+
+Tabelas:
+    snapshots: um registro por anúncio e data de crawl (chave crawl_date, id);
+               recarregar a mesma data substitui os anúncios daquela data
+    agg_precos: contagem, soma de preço e de preço/m², mínimo e máximo por
+                crawl_date, origem, tipo, ser e localizacao. Como são somas, os
+                agregados por bairro, SER, tipo ou data saem da soma das linhas,
+                sem ler os anúncios.
+
+A cada carga só a data do crawl carregado é recalculada em agg_precos; as
+datas anteriores ficam como estão.
+"""
+import argparse
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from load.data_ingestion import read_interim
+
+ROOT = Path(__file__).resolve().parents[2]
+WAREHOUSE = ROOT / "data" / "warehouse.duckdb"
+
+SNAPSHOT_COLUMNS = ['id', 'origem', 'tipo', 'localizacao', 'ser', 'prox_centro', 'prox_orla', 'area',
+                    'quartos', 'banheiros', 'vagas', 'condo', 'preco', 'timestamp_extracao']
+
+DDL = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    crawl_date DATE,
+    id VARCHAR,
+    origem VARCHAR,
+    tipo VARCHAR,
+    localizacao VARCHAR,
+    ser VARCHAR,
+    prox_centro BOOLEAN,
+    prox_orla BOOLEAN,
+    area INTEGER,
+    quartos SMALLINT,
+    banheiros SMALLINT,
+    vagas SMALLINT,
+    condo DOUBLE,
+    preco DOUBLE,
+    timestamp_extracao TIMESTAMP,
+    PRIMARY KEY (crawl_date, id)
+);
+
+CREATE TABLE IF NOT EXISTS agg_precos (
+    crawl_date DATE,
+    origem VARCHAR,
+    tipo VARCHAR,
+    ser VARCHAR,
+    localizacao VARCHAR,
+    qt_imoveis BIGINT,
+    soma_preco DOUBLE,
+    soma_preco_m2 DOUBLE,
+    min_preco DOUBLE,
+    max_preco DOUBLE
+);
+"""
+
+AGGREGATE_SQL = """
+    SELECT
+        crawl_date
+        , origem
+        , tipo
+        , ser
+        , localizacao
+        , COUNT(*) AS qt_imoveis
+        , SUM(preco) AS soma_preco
+        , SUM(preco / area) AS soma_preco_m2
+        , MIN(preco) AS min_preco
+        , MAX(preco) AS max_preco
+    FROM snapshots
+    WHERE crawl_date IN (SELECT crawl_date FROM touched)
+    GROUP BY ALL
+"""
+
+
+def connect(path:Path=WAREHOUSE, read_only:bool=False):
+    """
+    Abre o warehouse, criando as tabelas se ainda não existirem
+    """
+    con = duckdb.connect(str(path), read_only=read_only)
+    if not read_only:
+        con.execute(DDL)
+    return con
+
+
+def add_snapshot(con:duckdb.DuckDBPyConnection, df:pd.DataFrame, crawl_date:date=None):
+    """
+    Grava os anúncios de df como fotografia e recalcula os agregados das datas afetadas
+
+    Parâmetros:
+        con: duckdb.DuckDBPyConnection - Conexão com o warehouse (ver connect())
+        df: pd.DataFrame - Anúncios com as colunas de SNAPSHOT_COLUMNS
+        crawl_date: date - Data da fotografia (padrão: data do timestamp_extracao mais recente de df)
+
+    Uma carga é um crawl: todos os anúncios de df ficam na mesma data, mesmo que
+    as fontes tenham sido limpas em dias diferentes.
+    """
+    crawl_date = crawl_date or pd.Timestamp(df['timestamp_extracao'].max()).date()
+    crawl = f"DATE '{crawl_date.isoformat()}'"
+    con.register('carga', df)
+    try:
+        con.execute("BEGIN TRANSACTION")
+        con.execute(f"CREATE OR REPLACE TEMP TABLE touched AS SELECT {crawl} AS crawl_date")
+        con.execute("DELETE FROM snapshots WHERE crawl_date IN (SELECT crawl_date FROM touched)")
+        con.execute(
+            f"INSERT INTO snapshots SELECT DISTINCT ON (id) {crawl} AS crawl_date, "
+            f"{', '.join(SNAPSHOT_COLUMNS)} FROM carga ORDER BY id, timestamp_extracao DESC"
+        )
+        con.execute("DELETE FROM agg_precos WHERE crawl_date IN (SELECT crawl_date FROM touched)")
+        con.execute(f"INSERT INTO agg_precos {AGGREGATE_SQL}")
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    finally:
+        con.unregister('carga')
+    return crawl_date
+
+
+def latest_crawl(con:duckdb.DuckDBPyConnection):
+    return con.execute("SELECT MAX(crawl_date) FROM agg_precos").fetchone()[0]
+
+
+def precos_por(con:duckdb.DuckDBPyConnection, dimension:str, crawl_date:date=None, min_imoveis:int=0):
+    """
+    Preço médio e preço médio do m² por dimensão (localizacao, ser, tipo ou origem), a partir de agg_precos
+
+    Parâmetros:
+        con: duckdb.DuckDBPyConnection - Conexão com o warehouse
+        dimension: str - Coluna de agrupamento
+        crawl_date: date - Data do crawl (padrão: a mais recente)
+        min_imoveis: int - Número mínimo de anúncios do grupo
+    """
+    if dimension not in ('localizacao', 'ser', 'tipo', 'origem'):
+        raise ValueError(f"Dimensão desconhecida: {dimension}")
+    return con.execute(
+        f"""
+        SELECT
+            {dimension}
+            , SUM(soma_preco) / SUM(qt_imoveis) AS preco_medio
+            , SUM(soma_preco_m2) / SUM(qt_imoveis) AS preco_m2_medio
+            , CAST(SUM(qt_imoveis) AS BIGINT) AS qt_imoveis
+        FROM agg_precos
+        WHERE crawl_date = ?
+        GROUP BY {dimension}
+        HAVING SUM(qt_imoveis) >= ?
+        ORDER BY preco_medio DESC
+        """,
+        [crawl_date or latest_crawl(con), min_imoveis],
+    ).df()
+
+
+def historico(con:duckdb.DuckDBPyConnection, dimension:str=None, value:str=None):
+    """
+    Evolução do preço médio e do preço médio do m² por data de crawl, opcionalmente de um bairro/SER/tipo
+
+    Parâmetros:
+        con: duckdb.DuckDBPyConnection - Conexão com o warehouse
+        dimension: str - Coluna do filtro (localizacao, ser, tipo ou origem)
+        value: str - Valor do filtro
+    """
+    where, params = "", []
+    if dimension is not None:
+        if dimension not in ('localizacao', 'ser', 'tipo', 'origem'):
+            raise ValueError(f"Dimensão desconhecida: {dimension}")
+        where, params = f"WHERE {dimension} = ?", [value]
+    return con.execute(
+        f"""
+        SELECT
+            crawl_date
+            , SUM(soma_preco) / SUM(qt_imoveis) AS preco_medio
+            , SUM(soma_preco_m2) / SUM(qt_imoveis) AS preco_m2_medio
+            , CAST(SUM(qt_imoveis) AS BIGINT) AS qt_imoveis
+        FROM agg_precos
+        {where}
+        GROUP BY crawl_date
+        ORDER BY crawl_date
+        """,
+        params,
+    ).df()
+
+
+def report(con:duckdb.DuckDBPyConnection, repeat:int=5):
+    """
+    Compara o tempo das consultas por bairro/SER/tipo nos agregados e direto nas fotografias
+    """
+    crawl_date = latest_crawl(con)
+    raw = """
+        SELECT {dim}, AVG(preco) AS preco_medio, AVG(preco / area) AS preco_m2_medio, COUNT(*) AS qt_imoveis
+        FROM snapshots WHERE crawl_date = ? GROUP BY {dim} ORDER BY preco_medio DESC
+    """
+
+    def best(fn):
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            runs.append(time.perf_counter() - start)
+        return min(runs) * 1000
+
+    rows = con.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+    aggs = con.execute("SELECT COUNT(*) FROM agg_precos").fetchone()[0]
+    print(f"snapshots: {rows:,} linhas; agg_precos: {aggs:,} linhas; crawl mais recente: {crawl_date}\n")
+    print(f"{'consulta':<24} {'fotografias (ms)':>16} {'agregados (ms)':>15}")
+    for dim in ['localizacao', 'ser', 'tipo']:
+        scan = best(lambda: con.execute(raw.format(dim=dim), [crawl_date]).df())
+        agg = best(lambda: precos_por(con, dim, crawl_date))
+        print(f"{'preço por ' + dim:<24} {scan:>16.2f} {agg:>15.2f}")
+
+    print("\nPreço médio por data de crawl:")
+    print(historico(con).to_string(index=False))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--warehouse", type=Path, default=WAREHOUSE, help="Arquivo DuckDB (padrão: data/warehouse.duckdb)")
+    parser.add_argument("--crawl-date", type=date.fromisoformat, help="Data da fotografia (AAAA-MM-DD)")
+    parser.add_argument("--report", action="store_true", help="Só executa as consultas de exemplo")
+    args = parser.parse_args(argv)
+
+    if args.report:
+        con = connect(args.warehouse, read_only=True)
+        report(con)
+        con.close()
+        return 0
+
+    start = time.perf_counter()
+    con = connect(args.warehouse)
+    crawl_date = add_snapshot(con, read_interim(), args.crawl_date)
+    con.close()
+    print(f"Fotografia de {crawl_date} gravada em {args.warehouse} em {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
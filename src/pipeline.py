@@ -0,0 +1,319 @@
+"""
+Execução do pipeline completo (crawl -> limpeza -> carga -> dados tratados -> relatório) como um DAG
+
+Executar a partir da raiz do repositório:
+    python src/pipeline.py                       # limpeza, cargas, dados tratados e relatório (sem crawl)
+    python src/pipeline.py --crawl               # inclui os crawls (sempre executados)
+    python src/pipeline.py clean:lopes           # apenas as etapas indicadas e as que dependem delas
+    python src/pipeline.py --force               # ignora o cache
+    python src/pipeline.py --list                # mostra as etapas e as dependências
+
+Cada etapa é um comando executado em um subprocesso; etapas independentes (os
+crawls, a limpeza de cada fonte, as duas cargas) rodam em paralelo, até --jobs
+ao mesmo tempo. Uma etapa é pulada quando o hash das suas entradas e do seu
+código é o mesmo da última execução bem-sucedida e as saídas não foram alteradas
+desde então. O cache fica em data/state/pipeline.json e a saída de cada comando
+em data/state/pipeline/<etapa>.log.
+
+Os crawls não têm entradas locais, então nunca vêm do cache: só rodam com
+--crawl ou quando pedidos pelo nome. O spider já limpa os itens e grava
+data/interim/<fonte>.parquet; a etapa de limpeza da fonte apenas publica essa
+saída como .csv e dataset Parquet (cleaning.py --from-spider) e só limpa o
+arquivo bruto de data/raw/ quando ele é mais recente que a saída do crawl.
+"""
+import argparse
+import hashlib
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+STATE_FILE = ROOT / "data" / "state" / "pipeline.json"
+LOG_DIR = ROOT / "data" / "state" / "pipeline"
+
+sys.path.insert(0, str(ROOT / "src"))
+
+from transform.cleaning import SPECS
+
+TRANSFORM_CODE = ["src/transform/cleaning.py", "src/transform/bairros.py", "src/transform/reader.py",
+                  "src/transform/schema.py", "src/transform/state.py", "src/transform/storage.py"]
+INTERIM = ["data/interim/*.csv", "data/parquet/interim/**/*.parquet"]
+
+
+def crawl_output(fonte:str):
+    """
+    Saída já limpa do crawl de uma fonte (extract.pipelines.InterimParquetPipeline)
+    """
+    return str(Path(SPECS[fonte]['interim']).with_suffix('.parquet'))
+
+
+# Etapas do pipeline
+#   cmd: comando, relativo a cwd (padrão: raiz do repositório)
+#   deps: etapas que precisam terminar antes
+#   inputs/code: arquivos (ou globs) cujo conteúdo compõe a chave do cache
+#   outputs: arquivos gerados; se mudarem ou sumirem a etapa roda de novo
+#   crawl: etapa de crawl (sem cache, só roda com --crawl ou pelo nome)
+STAGES = {
+    'crawl:lopes': {
+        'cmd': [sys.executable, "-m", "scrapy", "crawl", "lopes"],
+        'cwd': "src",
+        'deps': [],
+        'inputs': [],
+        'code': ["src/extract/**/*.py"],
+        'outputs': [crawl_output('lopes')],
+        'crawl': True,
+    },
+    # As três categorias do Chaves na Mão são um único spider (mesmo scheduler e pool de conexões)
+    'crawl:chaves': {
+        'cmd': [sys.executable, "-m", "scrapy", "crawl", "chaves"],
+        'cwd': "src",
+        'deps': [],
+        'inputs': [],
+        'code': ["src/extract/**/*.py"],
+        'outputs': [crawl_output(fonte) for fonte in ['chaves_apts', 'chaves_casas', 'chaves_condominio']],
+        'crawl': True,
+    },
+    **{
+        f'clean:{fonte}': {
+            'cmd': [sys.executable, "src/transform/cleaning.py", fonte, "--from-spider"],
+            'deps': ['crawl:lopes' if fonte == 'lopes' else 'crawl:chaves'],
+            'inputs': [spec['raw'], crawl_output(fonte), "data/reference/bairros.csv"],
+            'code': TRANSFORM_CODE,
+            'outputs': [spec['interim'], f"data/parquet/interim/**/{fonte}_*.parquet"],
+        }
+        for fonte, spec in SPECS.items()
+    },
+    'load:sqlite': {
+        'cmd': [sys.executable, "src/load/data_ingestion.py"],
+        'deps': [f'clean:{fonte}' for fonte in SPECS],
+        'inputs': INTERIM,
+        'code': ["src/load/data_ingestion.py", *TRANSFORM_CODE],
+        'outputs': ["data/imv_database.db"],
+    },
+    'load:warehouse': {
+        'cmd': [sys.executable, "src/load/warehouse.py"],
+        'deps': [f'clean:{fonte}' for fonte in SPECS],
+        'inputs': INTERIM,
+        'code': ["src/load/warehouse.py", "src/load/data_ingestion.py", *TRANSFORM_CODE],
+        'outputs': ["data/warehouse.duckdb"],
+    },
+    'processed': {
+        'cmd': [sys.executable, "src/transform/processed.py"],
+        'deps': ['load:sqlite'],
+        'inputs': ["data/imv_database.db"],
+        'code': ["src/transform/processed.py", "src/load/data_ingestion.py", *TRANSFORM_CODE],
+        'outputs': ["data/processed/clean_data.csv", "data/parquet/processed/**/*.parquet"],
+    },
+    'report': {
+        'cmd': [sys.executable, "src/dashboard/report.py"],
+        'deps': ['processed'],
+        'inputs': ["data/processed/clean_data.csv", "data/parquet/processed/**/*.parquet"],
+        'code': ["src/dashboard/report.py", "src/dashboard/charts.py", "src/dashboard/data.py", "src/dashboard/queries.py"],
+        'outputs': ["data/state/report/report.json"],
+    },
+}
+
+
+def expand(patterns:list):
+    """
+    Arquivos de uma lista de caminhos/globs relativos à raiz, ordenados
+    """
+    files = set()
+    for pattern in patterns:
+        if any(char in pattern for char in "*?["):
+            files.update(path for path in ROOT.glob(pattern) if path.is_file())
+        elif (ROOT / pattern).is_file():
+            files.add(ROOT / pattern)
+    return sorted(files)
+
+
+class FileHashes:
+    """
+    sha256 do conteúdo dos arquivos, reaproveitado enquanto tamanho e mtime não mudam
+    """
+    def __init__(self, known:dict=None):
+        self.known = dict(known or {})
+
+    def file(self, path:Path):
+        key = str(path.relative_to(ROOT))
+        stat = path.stat()
+        cached = self.known.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        self.known[key] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def files(self, patterns:list):
+        """
+        Hash único do conjunto de arquivos (nomes e conteúdos)
+        """
+        digest = hashlib.sha256()
+        for path in expand(patterns):
+            digest.update(f"{path.relative_to(ROOT)}\0{self.file(path)}\0".encode())
+        return digest.hexdigest()
+
+
+def stage_key(name:str, stage:dict, hashes:FileHashes):
+    """
+    Chave do cache de uma etapa: comando, entradas e código
+    """
+    digest = hashlib.sha256(json.dumps([name, stage['cmd'][1:], stage.get('cwd')]).encode())
+    digest.update(hashes.files(stage['inputs']).encode())
+    digest.update(hashes.files(stage['code']).encode())
+    return digest.hexdigest()
+
+
+def load_state(path:Path=STATE_FILE):
+    if path.exists():
+        return json.loads(path.read_text())
+    return {'stages': {}, 'files': {}}
+
+
+def save_state(state:dict, path:Path=STATE_FILE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(json.dumps(state, indent=2))
+    tmp.replace(path)
+
+
+def select(targets:list, crawl:bool):
+    """
+    Etapas a executar: as indicadas (padrão: todas, com ou sem os crawls) e as que dependem delas
+    """
+    for target in targets:
+        if target not in STAGES:
+            raise ValueError(f"Etapa desconhecida: {target}")
+    selected = set(targets) or {name for name, stage in STAGES.items() if crawl or not stage.get('crawl')}
+    if crawl:
+        selected |= {name for name, stage in STAGES.items() if stage.get('crawl')}
+
+    changed = True
+    while changed:
+        dependents = {name for name, stage in STAGES.items() if set(stage['deps']) & selected} - selected
+        selected |= dependents
+        changed = bool(dependents)
+    return [name for name in STAGES if name in selected]
+
+
+def run_stage(name:str, stage:dict):
+    """
+    Executa o comando da etapa, gravando a saída em LOG_DIR; retorna (código de saída, segundos)
+    """
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    log = LOG_DIR / f"{name.replace(':', '_')}.log"
+    start = time.perf_counter()
+    with open(log, 'w') as f:
+        try:
+            code = subprocess.run(stage['cmd'], cwd=ROOT / stage.get('cwd', ''), stdout=f, stderr=subprocess.STDOUT).returncode
+        except FileNotFoundError as e:
+            f.write(f"{e}\n")
+            code = 127
+    return code, time.perf_counter() - start
+
+
+def run(targets:list=None, crawl:bool=False, force:bool=False, jobs:int=4):
+    """
+    Executa as etapas selecionadas respeitando as dependências
+
+    Parâmetros:
+        targets: list - Etapas pedidas (padrão: todas, exceto os crawls sem crawl=True)
+        crawl: bool - Inclui os crawls
+        force: bool - Executa mesmo as etapas em cache
+        jobs: int - Número máximo de etapas simultâneas
+
+    Retorna {etapa: (situação, segundos)}, com situação 'executada', 'cache', 'falhou' ou 'não executada'.
+    """
+    names = select(targets or [], crawl)
+    state = load_state()
+    hashes = FileHashes(state['files'])
+    results = {}
+    pending = list(names)
+    running = {}
+
+    def ready(name):
+        deps = [dep for dep in STAGES[name]['deps'] if dep in names]
+        return all(results.get(dep, ('',))[0] in ('executada', 'cache') for dep in deps)
+
+    def blocked(name):
+        deps = [dep for dep in STAGES[name]['deps'] if dep in names]
+        return any(results.get(dep, ('',))[0] in ('falhou', 'não executada') for dep in deps)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for name in list(pending):
+                stage = STAGES[name]
+                if blocked(name):
+                    pending.remove(name)
+                    results[name] = ('não executada', 0.0)
+                elif ready(name) and len(running) < jobs:
+                    pending.remove(name)
+                    key = stage_key(name, stage, hashes)
+                    cached = state['stages'].get(name, {})
+                    if (not force and not stage.get('crawl') and cached.get('key') == key
+                            and cached.get('outputs') == hashes.files(stage['outputs'])):
+                        results[name] = ('cache', 0.0)
+                        print(f"{name:<28} cache")
+                        continue
+                    print(f"{name:<28} iniciada")
+                    running[pool.submit(run_stage, name, stage)] = (name, key)
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, key = running.pop(future)
+                code, seconds = future.result()
+                if code == 0:
+                    state['stages'][name] = {'key': key, 'outputs': hashes.files(STAGES[name]['outputs']), 'seconds': seconds}
+                    results[name] = ('executada', seconds)
+                else:
+                    state['stages'].pop(name, None)
+                    results[name] = ('falhou', seconds)
+                print(f"{name:<28} {results[name][0]} ({seconds:.2f}s)")
+                if code != 0:
+                    print(f"    saída em {LOG_DIR.relative_to(ROOT) / (name.replace(':', '_') + '.log')}")
+                state['files'] = hashes.known
+                save_state(state)
+
+    state['files'] = hashes.known
+    save_state(state)
+    return {name: results[name] for name in names}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("stages", nargs="*", help="Etapas a executar (padrão: todas, exceto os crawls)")
+    parser.add_argument("--crawl", action="store_true", help="Inclui os crawls")
+    parser.add_argument("--force", action="store_true", help="Ignora o cache")
+    parser.add_argument("--jobs", type=int, default=4, help="Etapas simultâneas (padrão: 4)")
+    parser.add_argument("--list", action="store_true", help="Lista as etapas e sai")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, stage in STAGES.items():
+            print(f"{name:<28} <- {', '.join(stage['deps']) or '-'}")
+        return 0
+    start = time.perf_counter()
+    try:
+        results = run(args.stages, args.crawl, args.force, args.jobs)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"\n{'etapa':<28} {'situação':<14} {'segundos':>9}")
+    for name, (status, seconds) in results.items():
+        print(f"{name:<28} {status:<14} {seconds:>9.2f}")
+    print(f"{'soma das etapas':<28} {'':<14} {sum(seconds for _, seconds in results.values()):>9.2f}")
+    print(f"{'tempo total':<28} {'':<14} {time.perf_counter() - start:>9.2f}")
+    return 1 if any(status in ('falhou', 'não executada') for status, _ in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
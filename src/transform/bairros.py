@@ -0,0 +1,84 @@
+"""
+Tabela de referência dos bairros de Fortaleza (data/reference/bairros.csv)
+
+Cada bairro tem a sua Secretaria Regional Executiva (ser) e as flags de
+proximidade ao centro e à orla. A junção com os anúncios é feita por uma chave
+normalizada (minúsculas, sem acentos e sem espaços nas pontas), então grafias
+como 'Dionisio Torres' e 'Dionísio Torres' caem na mesma linha. Para corrigir um
+bairro sem correspondência basta acrescentar uma linha ao .csv.
+"""
+from pathlib import Path
+
+import duckdb
+
+BAIRROS_CSV = Path(__file__).resolve().parents[2] / "data" / "reference" / "bairros.csv"
+
+
+def chave(col:str):
+    """
+    Expressão SQL da chave normalizada de um bairro
+    """
+    return f"strip_accents(lower(trim({col})))"
+
+
+def load_bairros(con:duckdb.DuckDBPyConnection, path:Path=BAIRROS_CSV):
+    """
+    Cria a tabela bairros (bairro, ser, prox_centro, prox_orla, chave) na conexão
+
+    Parâmetros:
+        con: duckdb.DuckDBPyConnection - Conexão onde a tabela será criada
+        path: Path - Arquivo .csv de referência
+    """
+    con.execute(
+        f"""
+        CREATE OR REPLACE TABLE bairros AS
+        SELECT bairro, ser, prox_centro, prox_orla, {chave('bairro')} AS chave
+        FROM read_csv(?, header = true, columns = {{
+            'bairro': 'VARCHAR', 'ser': 'VARCHAR', 'prox_centro': 'BOOLEAN', 'prox_orla': 'BOOLEAN'
+        }})
+        """,
+        [str(path)],
+    )
+
+    conflitos = con.sql(
+        """
+        SELECT chave, string_agg(bairro, ', ') AS bairros
+        FROM bairros
+        GROUP BY chave
+        HAVING COUNT(DISTINCT (ser, prox_centro, prox_orla)) > 1
+        """
+    ).fetchall()
+    if conflitos:
+        raise ValueError(f"Bairros com a mesma chave e atributos diferentes em {path}: {conflitos}")
+
+    con.execute("CREATE OR REPLACE TABLE bairros AS SELECT DISTINCT ON (chave) * FROM bairros")
+
+
+def ensure_bairros(con:duckdb.DuckDBPyConnection):
+    """
+    Carrega a tabela bairros na conexão se ela ainda não existir
+    """
+    exists = con.execute("SELECT COUNT(*) FROM duckdb_tables() WHERE table_name = 'bairros'").fetchone()[0]
+    if not exists:
+        load_bairros(con)
+
+
+def unmatched_bairros(con:duckdb.DuckDBPyConnection, relation:str, col:str='localizacao'):
+    """
+    Bairros de uma tabela/view que não têm correspondência na referência, com a contagem de anúncios
+
+    Parâmetros:
+        con: duckdb.DuckDBPyConnection - Conexão com a tabela bairros carregada
+        relation: str - Nome da tabela, view ou DataFrame registrado
+        col: str - Coluna com o nome do bairro
+    """
+    ensure_bairros(con)
+    return con.sql(
+        f"""
+        SELECT t.{col} AS bairro, COUNT(*) AS qt_imoveis
+        FROM {relation} AS t
+        ANTI JOIN bairros AS b ON b.chave = {chave(f't.{col}')}
+        GROUP BY 1
+        ORDER BY 2 DESC, 1
+        """
+    ).to_df()
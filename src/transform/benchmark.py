@@ -0,0 +1,122 @@
+"""
+Benchmarks da etapa de limpeza (data/raw -> data/interim)
+
+Executar a partir da raiz do repositório:
+    python src/transform/benchmark.py engine
+    python src/transform/benchmark.py engines --scale 100
+    python src/transform/benchmark.py stream --scales 10 50 100
+
+engine: compara quatro execuções de cleaning.py com uma fonte cada (um
+interpretador por fonte, como os antigos scripts *_cleaning.py) com uma única
+execução que limpa todas as fontes em paralelo. As saídas vão para um
+diretório temporário.
+
+engines: compara o motor pandas (clean_source) com o motor SQL (sql_engine.py)
+em cópias dos arquivos de data/raw repetidas --scale vezes, reportando tempo e
+pico de memória residente. As fontes com remoção de duplicados descartam as
+cópias na limpeza, mas ainda precisam ler o arquivo inteiro.
+
+stream: pico de memória da leitura do arquivo inteiro x leitura em blocos
+(--chunk-size) para dados brutos ampliados em escalas crescentes. Na leitura em
+blocos o pico deve ficar estável à medida que a escala aumenta.
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from transform.cleaning import ROOT, SPECS
+
+CLEANING = Path(__file__).parent / "cleaning.py"
+
+
+def timed(cmd:list):
+    start = time.perf_counter()
+    subprocess.run(cmd, check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def bench_engine(repeat:int):
+    with tempfile.TemporaryDirectory() as tmp:
+        serial, parallel = [], []
+        for _ in range(repeat):
+            serial.append(sum(timed([sys.executable, CLEANING, fonte, "--output-dir", tmp]) for fonte in SPECS))
+            parallel.append(timed([sys.executable, CLEANING, "--output-dir", tmp]))
+
+    print(f"{'execução':<40} {'melhor (s)':>10}")
+    print(f"{'4 processos em sequência':<40} {min(serial):>10.2f}")
+    print(f"{'1 processo, fontes em paralelo':<40} {min(parallel):>10.2f}")
+    print(f"speedup: {min(serial) / min(parallel):.1f}x")
+
+
+def scale_raw(raw_dir:Path, scale:int):
+    """
+    Grava em raw_dir os arquivos brutos de todas as fontes repetidos scale vezes
+    """
+    for spec in SPECS.values():
+        items = json.loads((ROOT / spec['raw']).read_text(encoding="utf-8"))
+        with open(Path(raw_dir) / Path(spec['raw']).name, "w", encoding="utf-8") as f:
+            json.dump(items * scale, f, ensure_ascii=False)
+
+
+def run_cleaning(args:list):
+    """
+    Executa cleaning.py e retorna (segundos, pico de memória em MiB)
+    """
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, CLEANING, *args], check=True, capture_output=True, text=True).stdout
+    return time.perf_counter() - start, float(re.search(r"pico de memória (\S+) MiB", output).group(1))
+
+
+def bench_engines(scale:int, repeat:int):
+    with tempfile.TemporaryDirectory() as raw, tempfile.TemporaryDirectory() as out:
+        scale_raw(raw, scale)
+        mib = sum(f.stat().st_size for f in Path(raw).iterdir()) / 1024 ** 2
+        print(f"dados brutos x{scale}: {mib:,.0f} MiB\n")
+        print(f"{'motor':<10} {'melhor (s)':>10} {'pico (MiB)':>10}")
+        for engine in ["pandas", "duckdb"]:
+            runs = [
+                run_cleaning(["--engine", engine, "--workers", "1", "--raw-dir", raw, "--output-dir", out])
+                for _ in range(repeat)
+            ]
+            print(f"{engine:<10} {min(t for t, _ in runs):>10.2f} {max(p for _, p in runs):>10.0f}")
+
+
+
+def bench_stream(scales:list, chunk_size:int):
+    print(f"{'escala':>6} {'MiB brutos':>10} {'inteiro (s)':>11} {'pico (MiB)':>10} {'blocos (s)':>10} {'pico (MiB)':>10}")
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as raw, tempfile.TemporaryDirectory() as out:
+            scale_raw(raw, scale)
+            mib = sum(f.stat().st_size for f in Path(raw).iterdir()) / 1024 ** 2
+            args = ["--workers", "1", "--raw-dir", raw, "--output-dir", out]
+            whole = run_cleaning(args)
+            chunked = run_cleaning([*args, "--chunk-size", str(chunk_size)])
+        print(f"{scale:>6} {mib:>10,.0f} {whole[0]:>11.2f} {whole[1]:>10.0f} {chunked[0]:>10.2f} {chunked[1]:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="bench", required=True)
+    engine = sub.add_parser("engine", help="Scripts em sequência x cleaning.py em paralelo")
+    engine.add_argument("--repeat", type=int, default=3)
+    engines = sub.add_parser("engines", help="Motor pandas x motor DuckDB em dados ampliados")
+    engines.add_argument("--scale", type=int, default=100)
+    engines.add_argument("--repeat", type=int, default=1)
+    stream = sub.add_parser("stream", help="Leitura do arquivo inteiro x leitura em blocos")
+    stream.add_argument("--scales", type=int, nargs="+", default=[10, 50, 100])
+    stream.add_argument("--chunk-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    if args.bench == "engine":
+        bench_engine(args.repeat)
+    elif args.bench == "engines":
+        bench_engines(args.scale, args.repeat)
+    elif args.bench == "stream":
+        bench_stream(args.scales, args.chunk_size)
@@ -0,0 +1,488 @@
+"""
+Limpeza dos dados brutos de todas as fontes (data/raw -> data/interim)
+
+Executar a partir da raiz do repositório:
+    python src/transform/cleaning.py                       # todas as fontes em paralelo
+    python src/transform/cleaning.py lopes chaves_apts     # apenas algumas fontes
+    python src/transform/cleaning.py --check               # compara com data/interim sem gravar
+    python src/transform/cleaning.py --engine duckdb       # limpeza inteiramente em SQL (sql_engine.py)
+    python src/transform/cleaning.py --incremental         # limpa só os registros brutos novos (state.py)
+    python src/transform/cleaning.py --chunk-size 50000    # lê os arquivos brutos em blocos (reader.py)
+    python src/transform/cleaning.py --from-spider         # usa a saída já limpa do crawl, quando mais recente
+"""
+import argparse
+import io
+import json
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from transform.bairros import chave, ensure_bairros, unmatched_bairros
+from transform.reader import is_json_array, iter_chunks, raw_path
+from transform.schema import apply_schema, to_csv_frame
+from transform.state import TransformState, raw_keys
+from transform.storage import remove_prefix, write_frame
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Regras de limpeza de cada fonte de dados
+#   raw/interim: arquivos de entrada e saída, relativos à raiz do repositório
+#   origem: valor da coluna origem
+#   dropna_dedup: remove anúncios sem preço e linhas duplicadas
+#   digit_ints: colunas inteiras que precisam ter os caracteres não numéricos removidos
+#   int_pattern: regex dos caracteres removidos de digit_ints
+#   empty_zero: converte strings vazias em '0' depois da remoção de caracteres
+#   localizacao: como extrair o bairro do texto de localização
+SPECS = {
+    'lopes': {
+        'raw': "data/raw/lopes.json",
+        'interim': "data/interim/lopes.csv",
+        'origem': 'Lopes',
+        'dropna_dedup': True,
+        'digit_ints': ['area', 'quartos', 'banheiros', 'vagas'],
+        'int_pattern': '[^0-9d]',
+        'empty_zero': False,
+        'localizacao': 'lopes',
+    },
+    'chaves_apts': {
+        'raw': "data/raw/chaves.json",
+        'interim': "data/interim/chaves_apts.csv",
+        'origem': 'Chaves na Mão',
+        'dropna_dedup': True,
+        'digit_ints': ['quartos'],
+        'int_pattern': '[^0-9]',
+        'empty_zero': True,
+        'localizacao': 'chaves',
+    },
+    'chaves_casas': {
+        'raw': "data/raw/chaves_casas.json",
+        'interim': "data/interim/chaves_casas.csv",
+        'origem': 'Chaves na Mão',
+        'dropna_dedup': False,
+        'digit_ints': [],
+        'int_pattern': '[^0-9]',
+        'empty_zero': True,
+        'localizacao': 'chaves',
+    },
+    'chaves_condominio': {
+        'raw': "data/raw/chaves_condominio.json",
+        'interim': "data/interim/chaves_condominio.csv",
+        'origem': 'Chaves na Mão',
+        'dropna_dedup': False,
+        'digit_ints': [],
+        'int_pattern': '[^0-9]',
+        'empty_zero': True,
+        'localizacao': 'chaves',
+    },
+}
+
+RAW_COLUMNS = ['preco', 'tipo', 'localizacao', 'area', 'quartos', 'banheiros', 'vagas', 'condo']
+
+# Atributos que identificam um anúncio no id (preço e condomínio ficam de fora para
+# que um anúncio reprecificado mantenha o id)
+ID_COLUMNS = ['origem', 'tipo', 'localizacao', 'area', 'quartos', 'banheiros', 'vagas']
+
+# Normalização do bairro, SER e proximidade ao centro/orla (junção com a tabela de
+# referência de transform.bairros, pelo nome do bairro como veio da fonte) e filtros finais
+ENRICH_SQL = f"""
+    SELECT 
+        df.id
+        , df.origem
+        , df.tipo
+        , CASE 
+            WHEN LOWER(df.localizacao) LIKE '%praia do futuro%' THEN 'Praia do Futuro'
+            WHEN LOWER(df.localizacao) LIKE '%conjunto ceará%' THEN 'Conjunto Ceará'
+            WHEN LOWER(df.localizacao) LIKE '%coité%' THEN 'Coité' 
+            ELSE df.localizacao 
+        END AS localizacao
+        , COALESCE(b.ser, 'Outros') AS ser
+        , CASE WHEN b.prox_centro THEN 'Sim' ELSE 'Não' END AS prox_centro
+        , CASE WHEN b.prox_orla THEN 'Sim' ELSE 'Não' END AS prox_orla
+        , df.area
+        , df.quartos
+        , df.banheiros
+        , df.vagas
+        , df.condo
+        , df.preco
+        , df.timestamp_extracao
+    FROM df
+    LEFT JOIN bairros AS b ON b.chave = {chave('df.localizacao')}
+    WHERE
+        df.area >= 34
+        AND df.quartos > 0
+        AND df.banheiros > 0
+        AND df.preco >= 70000
+    ORDER BY df._ordem
+"""
+
+
+def gerar_ids(df:pd.DataFrame, offsets:dict=None):
+    """
+    Gera ids determinísticos (hash de 64 bits em hexadecimal) para todas as linhas de uma vez
+
+    O id é o hash dos atributos de ID_COLUMNS mais a ordem de ocorrência do anúncio
+    entre os que têm os mesmos atributos, então a mesma entrada gera sempre os
+    mesmos ids e anúncios idênticos não colidem.
+
+    Parâmetros:
+        df: pd.DataFrame - Dados com as colunas de ID_COLUMNS
+        offsets: dict - Ocorrências já vistas por hash de atributos, para gerar ids
+                        consistentes quando os dados chegam em lotes (atualizado aqui)
+    """
+    attrs = pd.util.hash_pandas_object(df[ID_COLUMNS], index=False)
+    occurrence = attrs.groupby(attrs, sort=False).cumcount()
+    if offsets is not None:
+        occurrence += np.fromiter((offsets.get(k, 0) for k in attrs.tolist()), dtype='int64', count=len(attrs))
+        counts = attrs.value_counts(sort=False)
+        for value, count in zip(counts.index.tolist(), counts.tolist()):
+            offsets[value] = offsets.get(value, 0) + count
+
+    keys = pd.DataFrame({'attrs': attrs, 'occurrence': occurrence})
+    return pd.util.hash_pandas_object(keys, index=False).map('{:016x}'.format)
+
+
+def parse_frame(df:pd.DataFrame, spec:dict):
+    """
+    Converte os campos de texto extraídos pelos spiders em números e bairro
+
+    Parâmetros:
+        df: pd.DataFrame - Dados brutos de uma fonte (colunas de RAW_COLUMNS)
+        spec: dict - Regras da fonte (item de SPECS)
+    """
+    df = df.copy()
+
+    # Limpeza de nulos e duplicados
+    if spec['dropna_dedup']:
+        df.dropna(subset='preco', inplace=True)
+        df.drop_duplicates(inplace=True)
+
+    # Limpeza das colunas com dtype FLOAT
+    for col in ['preco', 'condo']:
+        df.fillna({col: '0'}, inplace=True)
+        df[col] = df[col].astype(str).str.replace('[^0-9]', '', regex=True)
+        if spec['empty_zero']:
+            df[col] = df[col].replace('', '0')
+        df[col] = df[col].astype(float)
+
+    # Limpeza das colunas com dtype INT
+    for col in ['area', 'quartos', 'banheiros', 'vagas']:
+        if col in spec['digit_ints']:
+            df.fillna({col: '0'}, inplace=True)
+            df[col] = df[col].astype(str).str.replace(spec['int_pattern'], '', regex=True)
+            if spec['empty_zero']:
+                df[col] = df[col].replace('', '0')
+        else:
+            df.fillna({col: '0'}, inplace=True)
+        df[col] = df[col].astype(int)
+
+    # Limpeza na localização
+    if spec['localizacao'] == 'lopes':
+        df['localizacao'] = df['localizacao'].astype(str).str.split(',', expand=True).reindex(columns=[1])[1]
+        df['localizacao'] = df['localizacao'].astype(str).str.split('-', expand=True)[0]
+        df['localizacao'] = df['localizacao'].astype(str).str.strip()
+    else:
+        df['localizacao'] = df['localizacao'].astype(str).str.split(',', expand=True)[0]
+
+    return df
+
+
+def add_metadata(df:pd.DataFrame, spec:dict, timestamp:datetime=None, offsets:dict=None):
+    """
+    Adiciona origem, timestamp da extração e id (ver gerar_ids)
+    """
+    df['origem'] = spec['origem']
+    df['timestamp_extracao'] = timestamp or datetime.now()
+    df['id'] = gerar_ids(df, offsets)
+    return df
+
+
+def enrich(df:pd.DataFrame, con:duckdb.DuckDBPyConnection=None):
+    """
+    Normaliza o bairro, adiciona SER e proximidade ao centro/orla e aplica os filtros finais
+
+    O resultado já vem com os tipos de transform.schema.SCHEMA.
+
+    Parâmetros:
+        df: pd.DataFrame - Dados já convertidos por parse_frame() e add_metadata()
+        con: duckdb.DuckDBPyConnection - Conexão a ser usada (padrão: uma conexão nova em memória)
+    """
+    con = con or duckdb.connect()
+    ensure_bairros(con)
+    con.register('df', df.assign(_ordem=np.arange(len(df))))
+    try:
+        return apply_schema(con.sql(ENRICH_SQL).to_df())
+    finally:
+        con.unregister('df')
+
+
+def records_frame(records:list, spec:dict):
+    """
+    DataFrame de um bloco de registros brutos com os tipos que pd.read_json inferiria
+
+    As colunas inteiras convertidas direto por parse_frame() (fora de digit_ints)
+    viram números, como em pd.read_json; as demais ficam como texto.
+    """
+    df = pd.DataFrame(records, columns=RAW_COLUMNS)
+    for col in ['area', 'quartos', 'banheiros', 'vagas']:
+        if col not in spec['digit_ints']:
+            df[col] = pd.to_numeric(df[col])
+    return df
+
+
+def read_raw(raw:Path, spec:dict, chunk_size:int=None):
+    """
+    Lê o arquivo bruto e gera pares (DataFrame, hashes dos registros)
+
+    O hash de cada registro é calculado sobre os valores como vieram no JSON, para
+    não depender dos tipos que o pandas infere. Sem chunk_size o arquivo é lido
+    inteiro (um único par); com chunk_size é lido em blocos por transform.reader.
+    """
+    if chunk_size:
+        for chunk in iter_chunks(raw, chunk_size):
+            yield records_frame(chunk, spec), raw_keys(pd.DataFrame(chunk, columns=RAW_COLUMNS, dtype=object))
+        return
+
+    data = raw.read_bytes()
+    lines = not is_json_array(raw)
+    items = [json.loads(line) for line in data.splitlines() if line.strip()] if lines else json.loads(data)
+    yield pd.read_json(io.BytesIO(data), lines=lines), raw_keys(pd.DataFrame(items, columns=RAW_COLUMNS, dtype=object))
+
+
+def clean_source(fonte:str, output_dir:Path=None, raw_dir:Path=None, incremental:bool=False, chunk_size:int=None):
+    """
+    Limpa os dados brutos de uma fonte e grava o .csv em data/interim/ e no dataset
+    Parquet interim (transform.storage; <output_dir>/parquet/ quando output_dir é informado)
+
+    Parâmetros:
+        fonte: str - Chave de SPECS
+        output_dir: Path - Diretório de saída (padrão: o diretório de spec['interim'])
+        raw_dir: Path - Diretório dos arquivos brutos (padrão: o diretório de spec['raw'])
+        incremental: bool - Limpa só os registros que não constam no estado da fonte
+                            (transform.state) e acrescenta as linhas ao .csv existente.
+                            Sem estado ou sem .csv, faz a reconstrução completa.
+        chunk_size: int - Lê e limpa o arquivo bruto em blocos de chunk_size registros,
+                          gravando cada bloco no .csv à medida que fica pronto
+
+    Retorna um dict com o caminho do arquivo gravado (path), o número de linhas
+    gravadas (rows), o número de registros brutos limpos (records), o tempo em
+    segundos (seconds) e os bairros sem correspondência na tabela de referência
+    (unmatched).
+    """
+    start = time.perf_counter()
+    spec = SPECS[fonte]
+    raw = raw_path(ROOT / spec['raw'] if raw_dir is None else Path(raw_dir) / Path(spec['raw']).name)
+    path = ROOT / spec['interim'] if output_dir is None else Path(output_dir) / Path(spec['interim']).name
+
+    state = TransformState.for_fonte(fonte, output_dir)
+    incremental = incremental and state.exists() and path.exists()
+    if not incremental:
+        state.reset()
+
+    # Cada bloco limpo é gravado no .csv e, direto da memória, como novos arquivos
+    # do prefixo da fonte no dataset Parquet interim
+    parquet_base = None if output_dir is None else Path(output_dir) / "parquet"
+    if not incremental:
+        remove_prefix('interim', fonte, parquet_base)
+
+    con = duckdb.connect()
+    rows, records, unmatched = 0, 0, []
+    with open(path, 'a' if incremental else 'w', encoding='utf-8', newline='') as f:
+        header = not incremental
+        for frame, keys in read_raw(raw, spec, chunk_size):
+            # Os blocos seguintes enxergam os registros deste pelo estado (remoção
+            # de duplicados e ocorrências dos ids)
+            new = state.new_records(keys, spec['dropna_dedup'])
+            if not new.any():
+                continue
+            df = add_metadata(parse_frame(frame[new], spec), spec, offsets=state.offsets)
+            con.register('parsed', df)
+            unmatched.append(unmatched_bairros(con, 'parsed'))
+            con.unregister('parsed')
+            df = enrich(df, con)
+
+            to_csv_frame(df).to_csv(f, header=header, index=False)
+            if len(df):
+                write_frame(df, 'interim', fonte, parquet_base, append=True, con=con)
+            header = False
+            rows += len(df)
+            records += int(new.sum())
+
+    state.commit(records)
+    state.save()
+    if unmatched:
+        unmatched = pd.concat(unmatched).groupby('bairro', as_index=False)['qt_imoveis'].sum()
+        unmatched = unmatched.sort_values(['qt_imoveis', 'bairro'], ascending=[False, True], ignore_index=True)
+    else:
+        unmatched = pd.DataFrame({'bairro': pd.Series(dtype=str), 'qt_imoveis': pd.Series(dtype='int64')})
+    return {'path': path, 'rows': rows, 'records': records, 'seconds': time.perf_counter() - start, 'unmatched': unmatched}
+
+
+def spider_output(fonte:str):
+    """
+    data/interim/<fonte>.parquet gravado pelo crawl (extract.pipelines.InterimParquetPipeline),
+    se ele for mais recente que o arquivo bruto da fonte; senão None
+    """
+    spec = SPECS[fonte]
+    path = (ROOT / spec['interim']).with_suffix('.parquet')
+    raw = raw_path(ROOT / spec['raw'])
+    if not path.exists() or (raw.exists() and raw.stat().st_mtime_ns >= path.stat().st_mtime_ns):
+        return None
+    return path
+
+
+def publish_spider(fonte:str, output_dir:Path=None):
+    """
+    Grava o .csv e o dataset Parquet interim de uma fonte a partir da saída do crawl
+
+    Os itens já passaram no spider pelas mesmas regras de clean_source() (parse_frame,
+    add_metadata e enrich), então não são limpos de novo. O estado de --incremental
+    descreve o arquivo bruto, que não gerou estas linhas, e é apagado: a próxima
+    limpeza incremental dessa fonte faz a reconstrução completa.
+
+    Parâmetros:
+        fonte: str - Chave de SPECS (com spider_output() disponível)
+        output_dir: Path - Diretório de saída (padrão: o diretório de spec['interim'])
+
+    Retorna um dict como o de clean_source() (sem bairros sem correspondência, que
+    não são guardados pelo spider).
+    """
+    start = time.perf_counter()
+    spec = SPECS[fonte]
+    path = ROOT / spec['interim'] if output_dir is None else Path(output_dir) / Path(spec['interim']).name
+    parquet_base = None if output_dir is None else Path(output_dir) / "parquet"
+
+    df = apply_schema(pd.read_parquet(spider_output(fonte)))
+    to_csv_frame(df).to_csv(path, index=False)
+    write_frame(df, 'interim', fonte, parquet_base)
+    TransformState.for_fonte(fonte, output_dir).path.unlink(missing_ok=True)
+
+    unmatched = pd.DataFrame({'bairro': pd.Series(dtype=str), 'qt_imoveis': pd.Series(dtype='int64')})
+    return {'path': path, 'rows': len(df), 'records': len(df), 'seconds': time.perf_counter() - start, 'unmatched': unmatched}
+
+
+def clean_all(fontes:list=None, output_dir:Path=None, workers:int=None, engine:str='pandas', raw_dir:Path=None,
+              incremental:bool=False, chunk_size:int=None, from_spider:bool=False):
+    """
+    Limpa várias fontes em paralelo, uma por processo
+
+    Parâmetros:
+        fontes: list - Chaves de SPECS (padrão: todas)
+        output_dir: Path - Diretório de saída (padrão: data/interim/)
+        workers: int - Número de processos (padrão: um por fonte)
+        engine: str - 'pandas' (clean_source) ou 'duckdb' (sql_engine.clean_source_sql)
+        raw_dir: Path - Diretório dos arquivos brutos (padrão: data/raw/)
+        incremental: bool - Limpa só os registros novos (apenas no motor pandas, ver clean_source)
+        chunk_size: int - Lê os arquivos brutos em blocos (apenas no motor pandas, ver clean_source)
+        from_spider: bool - Fontes com saída do crawl mais recente que o arquivo bruto
+                            (spider_output) não são limpas de novo (publish_spider)
+    """
+    if engine == 'duckdb':
+        from transform.sql_engine import clean_source_sql as clean
+    else:
+        clean = clean_source
+
+    order = fontes or list(SPECS)
+    spider = [fonte for fonte in order if from_spider and spider_output(fonte)]
+    fontes = [fonte for fonte in order if fonte not in spider]
+    n = len(fontes)
+    with ProcessPoolExecutor(max_workers=workers or len(order)) as pool:
+        results = dict(zip(spider, pool.map(publish_spider, spider, [output_dir] * len(spider))))
+        if incremental or chunk_size:
+            results.update(zip(fontes, pool.map(clean, fontes, [output_dir] * n, [raw_dir] * n, [incremental] * n, [chunk_size] * n)))
+        else:
+            results.update(zip(fontes, pool.map(clean, fontes, [output_dir] * n, [raw_dir] * n)))
+    return {fonte: results[fonte] for fonte in order}
+
+
+def peak_rss_mib():
+    """
+    Pico de memória residente (MiB) deste processo e dos processos filhos já encerrados
+    """
+    try:
+        import resource
+    except ImportError:  # Windows
+        return float('nan')
+    usage = [resource.getrusage(who).ru_maxrss for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)]
+    # ru_maxrss vem em KiB no Linux e em bytes no macOS
+    return max(usage) / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+
+
+def strip_volatile(line:bytes):
+    """
+    Remove id (primeira coluna) e timestamp_extracao (última) de uma linha do .csv
+    """
+    return line.split(b',', 1)[-1].rsplit(b',', 1)[0]
+
+
+def compare_interim(path:Path, reference:Path):
+    """
+    Compara dois .csv de data/interim byte a byte, ignorando id e timestamp_extracao
+    (o timestamp muda a cada execução e os .csv versionados ainda têm ids UUID4).
+    Retorna a lista de números de linha diferentes.
+    """
+    new, ref = path.read_bytes().splitlines(), reference.read_bytes().splitlines()
+    diffs = [i for i, (a, b) in enumerate(zip(new, ref), 1) if strip_volatile(a) != strip_volatile(b)]
+    if len(new) != len(ref):
+        diffs.append(min(len(new), len(ref)) + 1)
+    return diffs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fontes", nargs="*", metavar="fonte", help=f"Fontes ({', '.join(SPECS)}); padrão: todas")
+    parser.add_argument("--workers", type=int, help="Número de processos (padrão: um por fonte)")
+    parser.add_argument("--output-dir", type=Path, help="Diretório de saída (padrão: data/interim/)")
+    parser.add_argument("--raw-dir", type=Path, help="Diretório dos arquivos brutos (padrão: data/raw/)")
+    parser.add_argument("--engine", choices=['pandas', 'duckdb'], default='pandas', help="Motor de limpeza (padrão: pandas)")
+    parser.add_argument("--incremental", action="store_true", help="Limpa só os registros brutos novos e acrescenta ao .csv (motor pandas)")
+    parser.add_argument("--chunk-size", type=int, help="Lê os arquivos brutos (array JSON ou JSON Lines) em blocos de N registros (motor pandas)")
+    parser.add_argument("--from-spider", action="store_true", help="Usa data/interim/<fonte>.parquet do crawl quando ele é mais recente que o arquivo bruto")
+    parser.add_argument("--check", action="store_true", help="Compara a saída com data/interim/ sem sobrescrever")
+    parser.add_argument("--unmatched", action="store_true", help="Lista os bairros sem correspondência em data/reference/bairros.csv")
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.fontes) - set(SPECS))
+    if unknown:
+        parser.error(f"fontes desconhecidas: {', '.join(unknown)}")
+    if (args.incremental or args.chunk_size) and args.engine != 'pandas':
+        parser.error("--incremental e --chunk-size só estão disponíveis no motor pandas")
+    if args.from_spider and args.check:
+        parser.error("--check compara a limpeza dos arquivos brutos; não use com --from-spider")
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp) if args.check else args.output_dir
+        results = clean_all(args.fontes, output_dir, args.workers, args.engine, args.raw_dir, args.incremental,
+                            args.chunk_size, args.from_spider)
+
+        ok = True
+        for fonte, result in results.items():
+            status = f"{len(result['unmatched'])} bairros sem SER"
+            if args.incremental:
+                status = f"{result['records']} registros novos, " + status
+            if args.check:
+                diffs = compare_interim(result['path'], ROOT / SPECS[fonte]['interim'])
+                ok = ok and not diffs
+                status += ", idêntico" if not diffs else f", {len(diffs)} linhas diferentes (ex.: linha {diffs[0]})"
+            print(f"{fonte:<18} {result['rows']:>6} linhas {result['seconds']:>6.2f}s  {status}")
+
+    if args.unmatched:
+        unmatched = pd.concat([r['unmatched'] for r in results.values()]).groupby('bairro')['qt_imoveis'].sum()
+        print("\nBairros sem correspondência (anúncios antes dos filtros):")
+        print(unmatched.sort_values(ascending=False).to_string())
+
+    print(f"\nTotal: {time.perf_counter() - start:.2f}s, pico de memória {peak_rss_mib():.0f} MiB")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""
+Dados tratados para o dashboard (raw_imoveis -> data/processed/clean_data.csv)
+
+Executar a partir da raiz do repositório:
+    python src/transform/processed.py           # processa só os anúncios novos ou atualizados
+    python src/transform/processed.py --full    # reprocessa a tabela inteira
+
+Mesmas regras do notebook (notebooks/pricing.ipynb):
+    - remove vagas >= 15, condo >= 200000 e area >= 1000;
+    - mantém apenas Apartamento, Casa e Condomínio;
+    - remove as linhas duplicadas (sem considerar id, origem e timestamp_extracao);
+    - cria quartos_ord, banheiros_ord e vagas_ord (5 = 5 ou mais).
+
+Os filtros, a remoção de duplicados (a primeira linha de raw_imoveis de cada
+grupo de COLUMNS) e as colunas ordinais são calculados no próprio SQLite. As
+linhas tratadas ficam em data/state/processed.parquet com o rowid (linha) e o id
+de origem e, nos metadados, o último timestamp_extracao lido do banco. Quando há
+anúncios novos ou atualizados, a execução lê do banco só o rowid e o id das
+linhas que ficam nos dados tratados e busca por completo apenas as que mudaram
+ou ainda não estão no estado. O .csv e o dataset Parquet processed
+(transform.storage) são regravados só quando algo mudou.
+"""
+import argparse
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from load.data_ingestion import DATABASE, flag_sql
+from transform.storage import write_frame
+
+ROOT = Path(__file__).resolve().parents[2]
+PROCESSED_CSV = ROOT / "data" / "processed" / "clean_data.csv"
+STATE_FILE = ROOT / "data" / "state" / "processed.parquet"
+
+TIPOS = ['Apartamento', 'Casa', 'Condomínio']
+COLUMNS = ['tipo', 'localizacao', 'ser', 'prox_centro', 'prox_orla', 'area', 'quartos', 'banheiros', 'vagas', 'condo', 'preco']
+ORDINALS = {'quartos_ord': 'quartos', 'banheiros_ord': 'banheiros', 'vagas_ord': 'vagas'}
+
+EXPRESSIONS = {col: flag_sql(col) if col.startswith('prox_') else col for col in COLUMNS}
+
+# rowid e id da primeira linha válida de cada grupo de COLUMNS: as linhas que ficam
+# nos dados tratados (com MIN(), o SQLite devolve o id da mesma linha)
+KEEP_SQL = f"""
+    SELECT MIN(rowid) AS linha, id
+    FROM raw_imoveis
+    WHERE vagas < 15 AND condo < 200000 AND area < 1000 AND tipo IN ({', '.join(f"'{tipo}'" for tipo in TIPOS)})
+    GROUP BY {', '.join(EXPRESSIONS.values())}
+"""
+
+CHANGED_SQL = "SELECT rowid AS linha, timestamp_extracao FROM raw_imoveis WHERE timestamp_extracao > ?"
+
+# Linhas completas de temp.wanted (rowids de KEEP_SQL que faltam no estado)
+ROWS_SQL = f"""
+    SELECT
+        raw_imoveis.rowid AS linha
+        , id
+        , {', '.join(f'{expr} AS {col}' if expr != col else col for col, expr in EXPRESSIONS.items())}
+        , {', '.join(f'MIN({col}, 5) AS {ordinal}' for ordinal, col in ORDINALS.items())}
+    FROM raw_imoveis
+    JOIN temp.wanted ON wanted.linha = raw_imoveis.rowid
+"""
+
+
+def read_state(state_file:Path):
+    """
+    Linhas tratadas e o último timestamp_extracao lido na execução anterior
+
+    Um estado sem esses metadados (gravado por uma versão anterior) é ignorado.
+    """
+    table = pq.read_table(state_file)
+    if b'since' not in (table.schema.metadata or {}):
+        return None, ''
+    return table.to_pandas(), table.schema.metadata[b'since'].decode()
+
+
+def save_state(state:pd.DataFrame, since:str, state_file:Path):
+    table = pa.Table.from_pandas(state, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, b'since': since.encode()})
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = state_file.with_suffix('.tmp')
+    pq.write_table(table, tmp)
+    tmp.replace(state_file)
+
+
+def read_rows(conn:sqlite3.Connection, linhas:list):
+    """
+    Colunas tratadas das linhas de raw_imoveis com os rowids pedidos
+    """
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (linha INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM temp.wanted")
+    conn.executemany("INSERT INTO temp.wanted VALUES (?)", ((linha,) for linha in linhas))
+    return pd.read_sql(ROWS_SQL, conn)
+
+
+def update_state(conn:sqlite3.Connection, state:pd.DataFrame, changed:pd.DataFrame):
+    """
+    Estado atualizado: as linhas de KEEP_SQL, reaproveitando do estado as que não mudaram
+
+    Uma linha sai do estado quando mudou, deixou de ser a primeira do seu grupo
+    (ex.: um anúncio anterior passou a ter os mesmos valores) ou o rowid passou a
+    ser de outro anúncio (ex.: tabela recriada pela carga).
+    """
+    keep = pd.read_sql(KEEP_SQL, conn)
+    if state is not None:
+        current = pd.MultiIndex.from_frame(state[['linha', 'id']]).isin(pd.MultiIndex.from_frame(keep))
+        state = state[current & ~state['linha'].isin(changed['linha'])]
+    missing = keep['linha'] if state is None else keep.loc[~keep['linha'].isin(state['linha']), 'linha']
+    rows = read_rows(conn, missing.tolist())
+    return pd.concat([state, rows], ignore_index=True) if state is not None else rows
+
+
+def processed_frame(state:pd.DataFrame):
+    """
+    Dados tratados a partir do estado, na ordem de raw_imoveis
+    """
+    return state.sort_values('linha')[COLUMNS + list(ORDINALS)].reset_index(drop=True)
+
+
+def build(database:Path=DATABASE, output:Path=PROCESSED_CSV, state_file:Path=STATE_FILE, full:bool=False):
+    """
+    Atualiza data/processed/clean_data.csv e o dataset Parquet processed
+
+    Parâmetros:
+        database: Path - Banco SQLite com raw_imoveis
+        output: Path - Arquivo .csv de saída (o dataset Parquet processed é sempre o de data/parquet/)
+        state_file: Path - Linhas já tratadas (ignorado com full=True)
+        full: bool - Reprocessa todos os anúncios
+
+    Retorna {changes, rows, seconds}: anúncios novos ou atualizados no banco e linhas gravadas (None se nada mudou).
+    """
+    start = time.perf_counter()
+    state, since = None, ''
+    if not full and state_file.exists() and output.exists():
+        state, since = read_state(state_file)
+
+    conn = sqlite3.connect(database)
+    try:
+        changed = pd.read_sql(CHANGED_SQL, conn, params=[since])
+        if state is not None and changed.empty:
+            return {'changes': 0, 'rows': None, 'seconds': time.perf_counter() - start}
+        state = update_state(conn, state, changed)
+    finally:
+        conn.close()
+
+    df = processed_frame(state)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(output, index=False)
+    write_frame(df, "processed", output.stem)
+    save_state(state, changed['timestamp_extracao'].max() if len(changed) else since, state_file)
+    return {'changes': len(changed), 'rows': len(df), 'seconds': time.perf_counter() - start}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", type=Path, default=DATABASE, help="Banco SQLite (padrão: data/imv_database.db)")
+    parser.add_argument("--full", action="store_true", help="Reprocessa todos os anúncios")
+    args = parser.parse_args(argv)
+
+    result = build(args.database, full=args.full)
+    if result['rows'] is None:
+        print(f"Nenhum anúncio novo em {args.database} ({result['seconds']:.2f}s)")
+    else:
+        print(f"{result['changes']} anúncios processados; {result['rows']} linhas salvas em {PROCESSED_CSV.relative_to(ROOT)} ({result['seconds']:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
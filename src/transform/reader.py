@@ -0,0 +1,87 @@
+"""
+Leitura em blocos dos arquivos brutos (cleaning.py --chunk-size)
+
+Aceita tanto um array JSON (o formato padrão dos feeds, data/raw/*.json) quanto
+JSON Lines (um anúncio por linha, formato 'jsonlines' dos feeds do Scrapy). O
+arquivo é lido aos poucos e os registros são entregues em listas de até
+chunk_size itens, então a memória usada não depende do tamanho do arquivo.
+"""
+import json
+from pathlib import Path
+
+READ_SIZE = 1 << 20
+
+_decoder = json.JSONDecoder()
+
+
+def raw_path(path:Path):
+    """
+    Arquivo bruto a ser lido: o .json pedido ou, se ele não existir, o .jsonl de mesmo nome
+    """
+    path = Path(path)
+    jsonl = path.with_suffix('.jsonl')
+    return jsonl if not path.exists() and jsonl.exists() else path
+
+
+def is_json_array(path:Path):
+    with open(path, 'rb') as f:
+        head = f.read(64).lstrip()
+    return head.startswith(b'[')
+
+
+def iter_json_lines(path:Path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def iter_json_array(path:Path):
+    """
+    Itens de um array JSON, decodificados um a um a partir de blocos de READ_SIZE caracteres
+    """
+    with open(path, encoding='utf-8') as f:
+        buffer = f.read(READ_SIZE).lstrip()
+        if not buffer.startswith('['):
+            raise ValueError(f"{path} não é um array JSON")
+        buffer, pos, eof = buffer[1:], 0, False
+        while True:
+            # Separadores entre os itens
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+            try:
+                item, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Item incompleto no fim do bloco: lê mais e tenta de novo
+                block = f.read(READ_SIZE)
+                eof = not block
+                buffer, pos = buffer[pos:] + block, 0
+                continue
+            yield item
+            pos = end
+            if pos > READ_SIZE:
+                buffer, pos = buffer[pos:], 0
+
+
+def iter_chunks(path:Path, chunk_size:int):
+    """
+    Registros do arquivo bruto em listas de até chunk_size itens
+
+    Parâmetros:
+        path: Path - Array JSON ou JSON Lines
+        chunk_size: int - Número máximo de registros por lista
+    """
+    items = iter_json_array(path) if is_json_array(path) else iter_json_lines(path)
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,143 @@
+"""
+Esquema tipado dos dados de data/interim e data/processed
+
+Executar a partir da raiz do repositório para ver a economia de memória:
+    python src/transform/schema.py                      # interim e processed
+    python src/transform/schema.py data/interim/lopes.csv
+
+Texto de baixa cardinalidade vira category, contagens viram inteiros pequenos e
+as flags de proximidade viram bool. Nos .csv as flags continuam gravadas como
+'Sim'/'Não' (FLAG_LABELS); na leitura também são aceitos 0/1 e True/False, como
+em data/processed/clean_data.csv.
+"""
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[2]
+
+SCHEMA = {
+    'id': 'string',
+    'origem': 'category',
+    'tipo': 'category',
+    'localizacao': 'category',
+    'ser': 'category',
+    'prox_centro': 'bool',
+    'prox_orla': 'bool',
+    'area': 'int32',
+    'quartos': 'int16',
+    'banheiros': 'int16',
+    'vagas': 'int16',
+    'condo': 'float64',
+    'preco': 'float64',
+    'timestamp_extracao': 'datetime64[ns]',
+    'quartos_ord': 'int8',
+    'banheiros_ord': 'int8',
+    'vagas_ord': 'int8',
+}
+
+FLAGS = [col for col, dtype in SCHEMA.items() if dtype == 'bool']
+
+DUCKDB_TYPES = {
+    'string': 'VARCHAR',
+    'category': 'VARCHAR',
+    'bool': 'BOOLEAN',
+    'int8': 'TINYINT',
+    'int16': 'SMALLINT',
+    'int32': 'INTEGER',
+    'float64': 'DOUBLE',
+    'datetime64[ns]': 'TIMESTAMP',
+}
+
+# Como as flags são gravadas nos .csv
+FLAG_LABELS = {True: 'Sim', False: 'Não'}
+
+FLAG_VALUES = {'Sim': True, 'Não': False, 'True': True, 'False': False, 'true': True, 'false': False,
+               '1': True, '0': False, 1: True, 0: False, True: True, False: False}
+
+
+def apply_schema(df:pd.DataFrame):
+    """
+    Converte as colunas de df que constam em SCHEMA para os tipos declarados
+
+    Parâmetros:
+        df: pd.DataFrame - Dados de interim ou processed (colunas fora de SCHEMA ficam como estão)
+    """
+    df = df.copy()
+    for col in df.columns.intersection(list(SCHEMA)):
+        if col in FLAGS:
+            values = df[col].map(FLAG_VALUES)
+            if values.isna().any():
+                raise ValueError(f"Valores inválidos em {col}: {sorted(df.loc[values.isna(), col].astype(str).unique())}")
+            df[col] = values.astype('bool')
+        elif SCHEMA[col].startswith('datetime'):
+            df[col] = pd.to_datetime(df[col])
+        else:
+            df[col] = df[col].astype(SCHEMA[col])
+    return df
+
+
+def read_csv(path:Path, **kwargs):
+    """
+    Lê um .csv de interim ou processed já com os tipos de SCHEMA
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    dtype = {col: SCHEMA[col] for col in header if col in SCHEMA and col not in FLAGS and not SCHEMA[col].startswith('datetime')}
+    dtype.update({col: 'string' for col in header if col in FLAGS})
+    return apply_schema(pd.read_csv(path, dtype=dtype, **kwargs))
+
+
+def typed_select(relation:str, columns:list):
+    """
+    SELECT do DuckDB que converte as colunas de uma tabela/consulta para os tipos de SCHEMA
+
+    Parâmetros:
+        relation: str - Tabela, view ou função de leitura (ex.: read_csv(...))
+        columns: list - Colunas da relação, na ordem de saída
+    """
+    exprs = []
+    for col in columns:
+        if col in FLAGS:
+            true = ", ".join(f"'{value}'" for value, flag in FLAG_VALUES.items() if flag and isinstance(value, str))
+            exprs.append(f"CAST({col} AS VARCHAR) IN ({true}) AS {col}")
+        elif col in SCHEMA:
+            exprs.append(f"CAST({col} AS {DUCKDB_TYPES[SCHEMA[col]]}) AS {col}")
+        else:
+            exprs.append(col)
+    return f"SELECT {', '.join(exprs)} FROM {relation}"
+
+
+def to_csv_frame(df:pd.DataFrame):
+    """
+    Cópia de df com as flags como texto (FLAG_LABELS), para gravar em .csv
+    """
+    return df.assign(**{col: df[col].map(FLAG_LABELS) for col in FLAGS if col in df.columns})
+
+
+def memory_report(path:Path):
+    """
+    Memória por linha de um .csv lido sem tipos (pd.read_csv) e com SCHEMA
+    """
+    plain = pd.read_csv(path)
+    typed = read_csv(path)
+    rows = max(len(plain), 1)
+    return {
+        'rows': len(plain),
+        'plain': plain.memory_usage(deep=True, index=False).sum() / rows,
+        'typed': typed.memory_usage(deep=True, index=False).sum() / rows,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", type=Path)
+    args = parser.parse_args()
+    paths = args.paths or sorted((ROOT / "data" / "interim").glob("*.csv")) + [ROOT / "data" / "processed" / "clean_data.csv"]
+
+    print(f"{'arquivo':<40} {'linhas':>7} {'sem tipos (B/linha)':>20} {'SCHEMA (B/linha)':>17} {'economia':>9}")
+    for path in paths:
+        report = memory_report(path)
+        saving = 1 - report['typed'] / report['plain']
+        name = str(path.relative_to(ROOT)) if path.is_relative_to(ROOT) else str(path)
+        print(f"{name:<40} {report['rows']:>7} {report['plain']:>20,.0f} {report['typed']:>17,.0f} {saving:>9.0%}")
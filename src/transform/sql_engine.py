@@ -0,0 +1,138 @@
+"""
+Motor de limpeza feito inteiramente em SQL no DuckDB (cleaning.py --engine duckdb)
+
+Aplica as mesmas regras de SPECS que parse_frame/add_metadata/enrich, mas sem
+passar por DataFrames: read_json do arquivo bruto, regexp_replace e casts,
+junção com a tabela de bairros, filtros e COPY direto para o .csv de saída e
+para o dataset Parquet interim.
+
+O id é o único passo fora do SQL: as colunas de ID_COLUMNS (uma coluna por
+atributo, não as linhas inteiras) voltam para o Python e passam por
+cleaning.gerar_ids, a mesma função do motor pandas, então os dois motores geram
+os mesmos ids.
+"""
+import time
+from datetime import datetime
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+
+from transform.bairros import ensure_bairros, unmatched_bairros
+from transform.cleaning import ENRICH_SQL, ID_COLUMNS, RAW_COLUMNS, ROOT, SPECS, gerar_ids
+from transform.reader import raw_path
+from transform.state import TransformState
+from transform.storage import write_relation
+
+
+def money(col:str, spec:dict):
+    digits = f"regexp_replace(COALESCE({col}, '0'), '[^0-9]', '', 'g')"
+    if spec['empty_zero']:
+        digits = f"COALESCE(NULLIF({digits}, ''), '0')"
+    return f"CAST({digits} AS DOUBLE)"
+
+
+def integer(col:str, spec:dict):
+    value = f"COALESCE({col}, '0')"
+    if col in spec['digit_ints']:
+        value = f"regexp_replace({value}, '{spec['int_pattern']}', '', 'g')"
+        if spec['empty_zero']:
+            value = f"COALESCE(NULLIF({value}, ''), '0')"
+        return f"CAST({value} AS BIGINT)"
+    # astype(int) do pandas trunca textos como '545.859'; o CAST do DuckDB arredondaria
+    return f"CAST(trunc(CAST({value} AS DOUBLE)) AS BIGINT)"
+
+
+def bairro(spec:dict):
+    if spec['localizacao'] == 'lopes':
+        rua_bairro = "COALESCE(str_split(COALESCE(localizacao, 'None'), ',')[2], 'None')"
+        return f"trim(str_split({rua_bairro}, '-')[1])"
+    return "str_split(COALESCE(localizacao, 'None'), ',')[1]"
+
+
+def parse_sql(spec:dict, raw:Path, timestamp:datetime):
+    """
+    SELECT que lê o arquivo bruto e produz as colunas esperadas por ENRICH_SQL
+    """
+    columns = ", ".join(f"'{col}': 'VARCHAR'" for col in RAW_COLUMNS)
+    dedup = ""
+    if spec['dropna_dedup']:
+        dedup = f"""
+        WHERE preco IS NOT NULL
+        QUALIFY row_number() OVER (PARTITION BY {', '.join(RAW_COLUMNS)} ORDER BY _ordem) = 1
+        """
+
+    return f"""
+    WITH raw AS (
+        SELECT *, row_number() OVER () AS _ordem
+        FROM read_json('{raw}', format = 'auto', columns = {{{columns}}})
+    ),
+    unique_raw AS (
+        SELECT * FROM raw {dedup}
+    ),
+    parsed AS (
+        SELECT
+            _ordem
+            , '{spec['origem']}' AS origem
+            , tipo
+            , {bairro(spec)} AS localizacao
+            , {integer('area', spec)} AS area
+            , {integer('quartos', spec)} AS quartos
+            , {integer('banheiros', spec)} AS banheiros
+            , {integer('vagas', spec)} AS vagas
+            , {money('condo', spec)} AS condo
+            , {money('preco', spec)} AS preco
+            , TIMESTAMP '{timestamp.isoformat(sep=' ')}' AS timestamp_extracao
+        FROM unique_raw
+    )
+    SELECT * FROM parsed
+    """
+
+
+def add_ids(con:duckdb.DuckDBPyConnection, table:str):
+    """
+    Acrescenta à tabela a coluna id calculada por cleaning.gerar_ids, na ordem de _ordem
+    """
+    attrs = con.sql(f"SELECT _ordem, {', '.join(ID_COLUMNS)} FROM {table} ORDER BY _ordem").df()
+    ids = pd.DataFrame({'_ordem': attrs['_ordem'], 'id': gerar_ids(attrs[ID_COLUMNS])})
+    con.register('ids', ids)
+    try:
+        con.execute(f"CREATE TEMP TABLE {table}_ids AS SELECT ids.id, t.* FROM {table} t JOIN ids USING (_ordem)")
+    finally:
+        con.unregister('ids')
+    con.execute(f"DROP TABLE {table}")
+    con.execute(f"ALTER TABLE {table}_ids RENAME TO {table}")
+
+
+def clean_source_sql(fonte:str, output_dir:Path=None, raw_dir:Path=None):
+    """
+    Equivalente a cleaning.clean_source() executado inteiramente no DuckDB
+
+    O estado de --incremental (transform.state) não é mantido por este motor e é
+    apagado junto com a regravação do .csv: a próxima limpeza incremental dessa
+    fonte no motor pandas faz a reconstrução completa, em vez de acrescentar de
+    novo registros que já estão no .csv.
+
+    Parâmetros:
+        fonte: str - Chave de SPECS
+        output_dir: Path - Diretório de saída (padrão: o diretório de spec['interim'])
+        raw_dir: Path - Diretório dos arquivos brutos (padrão: o diretório de spec['raw'])
+    """
+    start = time.perf_counter()
+    spec = SPECS[fonte]
+    raw = raw_path(ROOT / spec['raw'] if raw_dir is None else Path(raw_dir) / Path(spec['raw']).name)
+    path = ROOT / spec['interim'] if output_dir is None else Path(output_dir) / Path(spec['interim']).name
+
+    con = duckdb.connect()
+    ensure_bairros(con)
+    con.execute(f"CREATE TEMP TABLE df AS {parse_sql(spec, raw, datetime.now())}")
+    add_ids(con, 'df')
+
+    unmatched = unmatched_bairros(con, 'df')
+    con.execute(f"CREATE TEMP TABLE enriched AS {ENRICH_SQL}")
+    con.execute(f"COPY enriched TO '{path}' (HEADER, DELIMITER ',')")
+    write_relation(con, 'enriched', 'interim', fonte, None if output_dir is None else Path(output_dir) / "parquet")
+    rows = con.execute("SELECT COUNT(*) FROM enriched").fetchone()[0]
+    con.close()
+    TransformState.for_fonte(fonte, output_dir).path.unlink(missing_ok=True)
+    return {'path': path, 'rows': rows, 'seconds': time.perf_counter() - start, 'unmatched': unmatched}
@@ -0,0 +1,105 @@
+"""
+Estado da limpeza incremental (cleaning.py --incremental)
+
+Para cada fonte guarda quantas vezes cada registro bruto já foi limpo (pelo
+hash dos campos de RAW_COLUMNS) e as ocorrências por atributos de ID_COLUMNS
+usadas por gerar_ids(), então uma execução incremental limpa apenas os registros
+novos e gera os mesmos ids que uma reconstrução completa.
+"""
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+STATE_DIR = Path(__file__).resolve().parents[2] / "data" / "state" / "transform"
+
+
+def raw_keys(raw:pd.DataFrame):
+    """
+    Hash de 64 bits de cada registro bruto, calculado sobre os valores como vieram no JSON
+    """
+    return pd.util.hash_pandas_object(raw.astype(object), index=False).to_numpy()
+
+
+class TransformState:
+    """
+    Registros brutos já limpos de uma fonte, gravados em um .npz pequeno
+
+    Parâmetros:
+        path: Path - Arquivo de estado (criado no primeiro save())
+    """
+    def __init__(self, path:Path):
+        self.path = Path(path)
+        self.reset()
+        if self.path.exists():
+            with np.load(self.path) as data:
+                self.counts = dict(zip(data['raw_keys'].tolist(), data['raw_counts'].tolist()))
+                self.offsets = dict(zip(data['id_keys'].tolist(), data['id_counts'].tolist()))
+                self.records = int(data['records'])
+                self.updated = str(data['updated'])
+
+    @classmethod
+    def for_fonte(cls, fonte:str, state_dir:Path=None):
+        return cls(Path(state_dir or STATE_DIR) / f"{fonte}.npz")
+
+    def exists(self):
+        return self.path.exists()
+
+    def reset(self):
+        self.counts = {}
+        self.offsets = {}
+        self.records = 0
+        self.updated = None
+        self.run = {}
+
+    def new_records(self, keys:np.ndarray, dedup:bool):
+        """
+        Máscara dos registros ainda não limpos em um bloco do arquivo bruto
+
+        Os blocos de uma mesma execução devem ser passados em ordem. A n-ésima
+        ocorrência de um registro no arquivo só é nova se as execuções anteriores
+        limparam menos de n ocorrências dele. Nas fontes com remoção de duplicados
+        (dedup) só a primeira ocorrência conta; as repetições dentro do bloco
+        ficam para parse_frame().
+        """
+        prior = np.fromiter((self.counts.get(k, 0) for k in keys.tolist()), dtype='int64', count=len(keys))
+        run = np.fromiter((self.run.get(k, 0) for k in keys.tolist()), dtype='int64', count=len(keys))
+        series = pd.Series(keys)
+        occurrence = run + series.groupby(series, sort=False).cumcount().to_numpy()
+
+        counts = series.value_counts(sort=False)
+        for key, count in zip(counts.index.tolist(), counts.tolist()):
+            self.run[key] = self.run.get(key, 0) + count
+
+        if dedup:
+            return (prior == 0) & (run == 0)
+        return occurrence >= prior
+
+    def commit(self, records:int):
+        """
+        Incorpora às contagens as ocorrências lidas nesta execução
+
+        Parâmetros:
+            records: int - Número de registros limpos nesta execução
+        """
+        for key, count in self.run.items():
+            if count > self.counts.get(key, 0):
+                self.counts[key] = count
+        self.run = {}
+        self.records += records
+        self.updated = datetime.now().isoformat(timespec='seconds')
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp.npz")
+        np.savez(
+            tmp,
+            raw_keys=np.fromiter(self.counts.keys(), dtype='uint64', count=len(self.counts)),
+            raw_counts=np.fromiter(self.counts.values(), dtype='int64', count=len(self.counts)),
+            id_keys=np.fromiter(self.offsets.keys(), dtype='uint64', count=len(self.offsets)),
+            id_counts=np.fromiter(self.offsets.values(), dtype='int64', count=len(self.offsets)),
+            records=self.records,
+            updated=self.updated or '',
+        )
+        tmp.replace(self.path)
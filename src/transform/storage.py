@@ -0,0 +1,172 @@
+"""
+Armazenamento em Parquet particionado por origem e SER (data/parquet/<dataset>/)
+
+Executar a partir da raiz do repositório para converter os .csv existentes:
+    python src/transform/storage.py            # data/interim/*.csv e data/processed/clean_data.csv
+    python src/transform/storage.py processed  # apenas um dos datasets
+
+Cada dataset é um diretório no layout hive (origem=.../ser=.../<prefixo>_0.parquet,
+zstd), com os tipos de transform.schema. O prefixo dos arquivos é a fonte que os
+gerou, então regravar uma fonte não apaga as demais fontes da mesma partição.
+Filtros por origem ou ser leem apenas os diretórios correspondentes, tanto em
+read_dataset() (pyarrow) quanto no DuckDB (duckdb_source()).
+
+Datasets:
+    interim: saída de cleaning.py (uma fonte por prefixo)
+    processed: data/processed/clean_data.csv (sem origem, particionado só por ser)
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+import pyarrow.dataset as ds
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from transform.schema import SCHEMA, apply_schema, typed_select
+
+ROOT = Path(__file__).resolve().parents[2]
+PARQUET_DIR = ROOT / "data" / "parquet"
+PARTITIONS = ['origem', 'ser']
+
+
+def dataset_dir(name:str, base:Path=None):
+    return Path(base or PARQUET_DIR) / name
+
+
+def dataset_exists(name:str, base:Path=None):
+    return any(dataset_dir(name, base).rglob("*.parquet"))
+
+
+def duckdb_source(name:str, base:Path=None):
+    """
+    Expressão FROM do DuckDB para um dataset (as colunas de partição vêm do caminho)
+    """
+    return f"read_parquet('{dataset_dir(name, base)}/**/*.parquet', hive_partitioning = true, union_by_name = true)"
+
+
+def remove_prefix(name:str, prefix:str, base:Path=None):
+    """
+    Apaga os arquivos de um prefixo (fonte) em todas as partições do dataset
+    """
+    for old in dataset_dir(name, base).rglob(f"{prefix}_*.parquet"):
+        old.unlink()
+
+
+def write_relation(con:duckdb.DuckDBPyConnection, relation:str, name:str, prefix:str, base:Path=None,
+                   append:bool=False):
+    """
+    Grava uma tabela/consulta do DuckDB no dataset, substituindo os arquivos do mesmo prefixo
+
+    Parâmetros:
+        con: duckdb.DuckDBPyConnection - Conexão onde a relação existe
+        relation: str - Tabela, view ou função de leitura
+        name: str - Nome do dataset
+        prefix: str - Prefixo dos arquivos (normalmente a fonte)
+        base: Path - Diretório dos datasets (padrão: data/parquet/)
+        append: bool - Acrescenta novos arquivos ao prefixo em vez de substituí-los
+    """
+    path = dataset_dir(name, base)
+    if not append:
+        remove_prefix(name, prefix, base)
+    path.mkdir(parents=True, exist_ok=True)
+
+    columns = [row[0] for row in con.sql(f"DESCRIBE SELECT * FROM {relation}").fetchall()]
+    partitions = [col for col in PARTITIONS if col in columns]
+    pattern = f"{prefix}_{{uuid}}" if append else f"{prefix}_{{i}}"
+    con.execute(
+        f"COPY ({typed_select(relation, columns)}) TO '{path}' "
+        f"(FORMAT parquet, COMPRESSION zstd, PARTITION_BY ({', '.join(partitions)}), "
+        f"FILENAME_PATTERN '{pattern}', OVERWRITE_OR_IGNORE)"
+    )
+
+
+def write_frame(df:pd.DataFrame, name:str, prefix:str, base:Path=None, append:bool=False,
+                con:duckdb.DuckDBPyConnection=None):
+    """
+    Grava um DataFrame no dataset direto da memória (ver write_relation())
+    """
+    con = con or duckdb.connect()
+    con.register('_frame', df)
+    try:
+        write_relation(con, '_frame', name, prefix, base, append)
+    finally:
+        con.unregister('_frame')
+
+
+def write_csv(csv:Path, name:str, prefix:str=None, base:Path=None):
+    """
+    Converte um .csv de interim/processed para o dataset (prefixo padrão: nome do arquivo)
+    """
+    # Colunas lidas como texto e convertidas por typed_select(); sem a detecção
+    # automática de formato, que custa mais que a própria leitura em arquivos pequenos
+    columns = ", ".join(f"'{col}': 'VARCHAR'" for col in pd.read_csv(csv, nrows=0).columns)
+    con = duckdb.connect()
+    try:
+        relation = f"read_csv('{csv}', header = true, auto_detect = false, columns = {{{columns}}})"
+        write_relation(con, relation, name, prefix or Path(csv).stem, base)
+    finally:
+        con.close()
+
+
+def filter_expression(filters:dict):
+    """
+    Expressão do pyarrow a partir de {coluna: valor ou lista de valores}
+    """
+    expression = None
+    for col, value in (filters or {}).items():
+        values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+        condition = ds.field(col).isin(values)
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def read_dataset(name:str, columns:list=None, filters:dict=None, base:Path=None):
+    """
+    Lê um dataset como pd.DataFrame com os tipos de SCHEMA
+
+    Parâmetros:
+        name: str - Nome do dataset
+        columns: list - Colunas a ler (padrão: todas); as demais não são lidas do disco
+        filters: dict - {coluna: valor ou lista}; em origem/ser só as partições correspondentes são lidas
+        base: Path - Diretório dos datasets (padrão: data/parquet/)
+    """
+    dataset = ds.dataset(dataset_dir(name, base), format="parquet", partitioning="hive")
+    df = dataset.to_table(columns=columns, filter=filter_expression(filters)).to_pandas()
+    order = [col for col in SCHEMA if col in df.columns] + [col for col in df.columns if col not in SCHEMA]
+    return apply_schema(df[columns or order])
+
+
+def partition_values(name:str, col:str, base:Path=None):
+    """
+    Valores de uma coluna de partição, a partir dos nomes dos diretórios (sem ler os dados)
+    """
+    dataset = ds.dataset(dataset_dir(name, base), format="parquet", partitioning="hive")
+    values = set()
+    for expression in (fragment.partition_expression for fragment in dataset.get_fragments()):
+        values.update(v for k, v in ds.get_partition_keys(expression).items() if k == col)
+    return sorted(values)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("datasets", nargs="*", help="Datasets a converter: interim, processed (padrão: todos)")
+    parser.add_argument("--base", type=Path, help="Diretório dos datasets (padrão: data/parquet/)")
+    args = parser.parse_args()
+    datasets = args.datasets or ["interim", "processed"]
+    if set(datasets) - {"interim", "processed"}:
+        parser.error(f"Datasets desconhecidos: {', '.join(sorted(set(datasets) - {'interim', 'processed'}))}")
+
+    if "interim" in datasets:
+        for csv in sorted((ROOT / "data" / "interim").glob("*.csv")):
+            write_csv(csv, "interim", base=args.base)
+    if "processed" in datasets:
+        write_csv(ROOT / "data" / "processed" / "clean_data.csv", "processed", base=args.base)
+
+    for name in datasets:
+        files = list(dataset_dir(name, args.base).rglob("*.parquet"))
+        mib = sum(f.stat().st_size for f in files) / 1024 ** 2
+        print(f"{dataset_dir(name, args.base)}: {len(files)} arquivos, {mib:.2f} MiB")
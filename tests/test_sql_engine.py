@@ -0,0 +1,53 @@
+"""
+Motor DuckDB (sql_engine) seguido de uma limpeza incremental do motor pandas
+
+Executar a partir da raiz do repositório:
+    python -m pytest tests/
+"""
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from transform.cleaning import SPECS, clean_source
+from transform.sql_engine import clean_source_sql
+from transform.state import TransformState
+
+
+def content(path:Path):
+    """
+    Linhas do .csv sem as colunas que mudam a cada execução (timestamp_extracao)
+    """
+    df = pd.read_csv(path).drop(columns='timestamp_extracao')
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+def test_incremental_after_sql_engine(tmp_path):
+    fonte = 'lopes'
+    raw = ROOT / SPECS[fonte]['raw']
+    records = json.loads(raw.read_text(encoding='utf-8'))
+    raw_dir, output_dir = tmp_path / "raw", tmp_path / "interim"
+    raw_dir.mkdir()
+    output_dir.mkdir()
+
+    # Estado incremental de uma versão anterior (menor) do arquivo bruto
+    (raw_dir / raw.name).write_text(json.dumps(records[:len(records) // 2]), encoding='utf-8')
+    clean_source(fonte, output_dir, raw_dir, incremental=True)
+    assert TransformState.for_fonte(fonte, output_dir).exists()
+
+    # O motor DuckDB regrava o .csv a partir do arquivo completo
+    (raw_dir / raw.name).write_text(json.dumps(records), encoding='utf-8')
+    result = clean_source_sql(fonte, output_dir, raw_dir)
+    expected = content(result['path'])
+    assert not TransformState.for_fonte(fonte, output_dir).exists()
+
+    # Sem estado, a limpeza incremental reconstrói o .csv em vez de acrescentar
+    # de novo os registros que o motor DuckDB já gravou
+    result = clean_source(fonte, output_dir, raw_dir, incremental=True)
+    assert result['rows'] == len(expected)
+    pd.testing.assert_frame_equal(content(result['path']), expected)
+    assert not pd.read_csv(result['path'])['id'].duplicated().any()